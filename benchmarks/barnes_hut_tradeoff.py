@@ -0,0 +1,63 @@
+"""Accuracy and speed of Barnes-Hut gravity against direct summation.
+
+Run from the repository root:
+
+    python benchmarks/barnes_hut_tradeoff.py               # 10000 bodies
+    python benchmarks/barnes_hut_tradeoff.py -n 30000 --theta 0.3 0.5 0.7
+
+For a Plummer-like cluster of n bodies this times nbody.accelerations (direct
+summation) once and barnes_hut.Octree for each opening angle, and reports
+the speedup and the median, 99th percentile and largest relative error of
+the accelerations.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'vpython'))
+
+import nbody
+from barnes_hut import Octree
+
+
+def cluster(n, seed=0):
+    """Positions (n, 3) in meters and masses (n,) in kg of a centrally concentrated star cluster."""
+    rng = np.random.default_rng(seed)
+    radius = 3e16 / np.sqrt(rng.uniform(0.01, 1, n) ** (-2 / 3) - 1)
+    direction = rng.normal(size=(n, 3))
+    direction /= np.linalg.norm(direction, axis=1)[:, np.newaxis]
+    return radius[:, np.newaxis] * direction, rng.uniform(0.1, 2, n) * 2e30
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--bodies', type=int, default=10000)
+    parser.add_argument('--theta', type=float, nargs='+', default=[0.2, 0.3, 0.5, 0.7, 1.0])
+    args = parser.parse_args(argv)
+
+    positions, masses = cluster(args.bodies)
+    start = time.perf_counter()
+    exact = nbody.accelerations(positions, masses)
+    direct_time = time.perf_counter() - start
+    exact_magnitude = np.linalg.norm(exact, axis=1)
+    print(f"{args.bodies} bodies, direct summation {direct_time:0.3f} s")
+
+    print(f"{'theta':>6}{'build (s)':>11}{'walk (s)':>10}{'speedup':>9}{'median':>11}{'99%':>11}{'max':>11}")
+    for theta in args.theta:
+        start = time.perf_counter()
+        tree = Octree(positions, masses)
+        built = time.perf_counter()
+        approximate = tree.accelerations(theta)
+        walked = time.perf_counter()
+        error = np.linalg.norm(approximate - exact, axis=1) / exact_magnitude
+        print(f"{theta:>6.2f}{built - start:>11.3f}{walked - built:>10.3f}{direct_time / (walked - start):>8.1f}x"
+              f"{np.median(error):>11.2e}{np.percentile(error, 99):>11.2e}{error.max():>11.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+"""Benchmarks for the mission planner and simulation hot paths.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py                  # run and compare with the baseline
+    python benchmarks/run_benchmarks.py --save-baseline  # run and store a new baseline
+    python benchmarks/run_benchmarks.py -k starship      # only benchmarks whose name contains 'starship'
+
+Each benchmark reports its best throughput over several repeats and the peak
+memory allocated by one run (measured separately with tracemalloc so it does
+not slow the timed runs). Results are compared with benchmarks/baseline.json;
+a benchmark more than --tolerance slower than its baseline is reported as a
+regression and the script exits with status 1. Baselines are machine
+specific, so store a new one when changing hardware.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'notebooks'))
+sys.path.insert(0, os.path.join(ROOT, 'vpython'))
+
+from scimath.units.length import light_year as ly
+from scimath.units.length import meters as m
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+from scimath.units.time import years as yr
+import numpy as np
+
+from starship import Engine, Starship
+from gravity import solar_departure
+from batch import evaluate_missions
+from solver import MissionSolver
+from optimizer import MissionOptimizer
+from staging import optimal_staging
+from plan import compile_plan
+import habitat
+import nbody
+from barnes_hut import Octree
+from sinks import ArraySink, EveryK, LTTB, Tee
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+benchmarks = []
+
+
+def benchmark(unit):
+    """Register a benchmark. The function runs once and returns how many units of work it did."""
+    def register(function):
+        benchmarks.append((function.__name__, unit, function))
+        return function
+    return register
+
+
+def _ship(check_units=True, record_messages=True, **kwargs):
+    return Starship(1.0 * kg, {'main': Engine(1000.0 * kg)},
+                    check_units=check_units, record_messages=record_messages, **kwargs)
+
+
+def _standard_mission(check_units):
+    ss = _ship(check_units)
+    ss.wait(10 * yr)
+    ss.accelerate(fuel_mass=900 * kg)
+    ss.cruise(ss.destination_distance)
+    ss.accelerate(decelerate=True)
+    ss.wait(10 * yr)
+    return ss
+
+
+@benchmark('burns/s')
+def engine_burn_fuel():
+    engine = Engine(1000.0 * kg)
+    burn, mass = 1e-3 * kg, 1001.0 * kg
+    for _ in range(2000):
+        engine.burn_fuel(burn, mass)
+    return 2000
+
+
+@benchmark('steps/s')
+def starship_accelerate():
+    ss = _ship()
+    for _ in range(500):
+        ss.accelerate(fuel_mass=0.1 * kg)
+    return 500
+
+
+@benchmark('steps/s')
+def starship_accelerate_fast():
+    ss = _ship(check_units=False)
+    for _ in range(2000):
+        ss.accelerate(fuel_mass=0.1 * kg)
+    return 2000
+
+
+@benchmark('steps/s')
+def starship_cruise():
+    ss = _ship()
+    ss.accelerate(fuel_mass=1 * kg)
+    for _ in range(1000):
+        ss.cruise(0.001 * ly)
+    return 1000
+
+
+@benchmark('steps/s')
+def starship_wait():
+    ss = _ship()
+    for _ in range(1000):
+        ss.wait(1 * yr)
+    return 1000
+
+
+@benchmark('steps/s')
+def starship_wait_fast():
+    ss = _ship(check_units=False, record_messages=False)
+    for _ in range(5000):
+        ss.wait(1 * yr)
+    return 5000
+
+
+@benchmark('entries/s')
+def log_entry_parse_logs():
+    ss = _ship()
+    for _ in range(2000):
+        ss.log_entry()
+    ss.parse_logs()
+    return 2000
+
+
+@benchmark('plots/s')
+def plot_history():
+    ss = _standard_mission(True)
+    for _ in range(5):
+        plt.close(ss.plot_history())
+    return 5
+
+
+@benchmark('missions/s')
+def standard_mission():
+    for _ in range(50):
+        _standard_mission(True)
+    return 50
+
+
+@benchmark('missions/s')
+def standard_mission_fast():
+    for _ in range(200):
+        _standard_mission(False)
+    return 200
+
+
+@benchmark('missions/s')
+def starship_constant_thrust():
+    for _ in range(200):
+        ss = _ship(constant_thrust=True)
+        ss.accelerate(fuel_mass=900 * kg)
+        ss.cruise(ss.destination_distance - 2 * ss.position)
+        ss.accelerate(decelerate=True)
+    return 200
+
+
+@benchmark('missions/s')
+def standard_mission_gravity():
+    # Departure from low Earth orbit to a stop, parked 1 au short of the destination star
+    field = solar_departure()
+    for _ in range(5):
+        ss = _ship(gravity=field)
+        ss.wait(10 * yr)
+        ss.accelerate(fuel_mass=900 * kg)
+        ss.cruise(ss.destination_distance - 2 * ss.position)
+        ss.accelerate(decelerate=True)
+        ss.wait(10 * yr)
+    return 5
+
+
+@benchmark('missions/s')
+def batch_missions():
+    n = 100000
+    evaluate_missions(kg * np.linspace(1, 10, n), 1000 * kg, kg * np.linspace(100, 990, n))
+    return n
+
+
+@benchmark('missions/s')
+def batch_missions_relativistic():
+    n = 100000
+    evaluate_missions(kg * np.linspace(1, 10, n), 1000 * kg, kg * np.linspace(100, 990, n), relativistic=True)
+    return n
+
+
+@benchmark('queries/s')
+def mission_solver():
+    solver = MissionSolver(1 * kg, 1000 * kg)
+    for _ in range(2000):
+        solver.solve(900 * kg)
+    return 2000
+
+
+@benchmark('plans/s')
+def mission_optimizer():
+    engines = {'chemical': Engine(500.0 * kg, exhaust_velocity=1e5 * m / s),
+               'fusion': Engine(300.0 * kg, exhaust_velocity=5e5 * m / s)}
+    optimizer = MissionOptimizer(1.0 * kg, engines, total_fuel=600.0 * kg)
+    for _ in range(5):
+        optimizer.minimize_time()
+        optimizer.minimize_fuel(2000 * yr)
+    return 10
+
+
+_STANDARD_PLAN = {'name': 'standard mission',
+                  'steps': [{'wait': '10 yr'},
+                            {'accelerate': {'fuel_mass': '900 kg'}},
+                            {'cruise': 'symmetric'},
+                            {'accelerate': {'decelerate': True}}]}
+
+
+@benchmark('plans/s')
+def mission_plan_compile():
+    for _ in range(5000):
+        compile_plan(_STANDARD_PLAN)
+    return 5000
+
+
+@benchmark('missions/s')
+def mission_plan_execute():
+    # One compiled plan flown by ships with different payloads
+    plan = compile_plan(_STANDARD_PLAN)
+    for payload in np.linspace(0.1, 1.0, 2000):
+        plan.execute(Starship(payload * kg, {'main': Engine(1000.0 * kg)}, record_messages=False))
+    return 2000
+
+
+@benchmark('designs/s')
+def staging_optimal_split():
+    n = 100000
+    rng = np.random.default_rng(0)
+    exhaust_velocity = (m / s) * rng.uniform(2e3, 5e3, (n, 3))
+    structural_ratio = rng.uniform(0.05, 0.15, (n, 3))
+    optimal_staging(1.0 * kg, (m / s) * np.linspace(3e3, 12e3, n), exhaust_velocity, structural_ratio)
+    return n
+
+
+@benchmark('steps/s')
+def cylinder_projectile_script():
+    """The vpython/cylinder_projectile.py launch through habitat, with array sinks in place of the ball and graphs."""
+    frames, _ = habitat.integrate_trajectory(np.array([1, 1, 50]) * 0.145, mass=0.145, initial_position=(0, 0, 0.01),
+                                             dt=1e-3, sink=Tee(EveryK(ArraySink(16), 10),
+                                                               LTTB(ArraySink(16), 20, column=3)))
+    return int(round(frames[-1, 0] / 1e-3))
+
+
+@benchmark('steps/s')
+def habitat_integrate_trajectory():
+    trajectory = habitat.integrate_trajectory(np.array([1, 1, 50]) * 0.145)
+    return len(trajectory.t)
+
+
+@benchmark('steps/s')
+def habitat_stream_lttb():
+    rows = habitat.integrate_trajectory(np.array([1, 1, 50]) * 0.145, sink=LTTB(ArraySink(16), 100, column=3))
+    return int(round(rows[-1, 0] / 1e-3))
+
+
+@benchmark('trajectories/s')
+def habitat_integrate_dopri5():
+    for _ in range(20):
+        habitat.integrate_trajectory(np.array([1, 1, 50]) * 0.145, method='dopri5')
+    return 20
+
+
+@benchmark('trajectories/s')
+def habitat_analytic_trajectory():
+    for _ in range(200):
+        habitat.analytic_trajectory(np.array([1, 1, 50]) * 0.145)
+    return 200
+
+
+@benchmark('launches/s')
+def habitat_landing():
+    rng = np.random.default_rng(0)
+    n = 1000000
+    p_init = np.column_stack([rng.uniform(-5, 5, n), rng.uniform(-5, 5, n), rng.uniform(1, 30, n)]) * 0.145
+    habitat.landing(p_init)
+    return n
+
+
+@benchmark('case-steps/s')
+def habitat_integrate_ensemble():
+    rng = np.random.default_rng(0)
+    p_init = np.column_stack([rng.uniform(-5, 5, 1000), rng.uniform(-5, 5, 1000), rng.uniform(1, 30, 1000)]) * 0.145
+    ensemble = habitat.integrate_ensemble(p_init)
+    return int(np.sum(np.round(ensemble.flight_time / 1e-3)))
+
+
+@benchmark('steps/s')
+def nbody_binarystar():
+    """The vpython_binarystar.py system integrated headless with nbody."""
+    masses = np.array([2e30, 1e30])
+    momenta = np.array([[0, 0, -1e4], [0, 0, 1e4]]) * 2e30
+    nbody.integrate([[-1e11, 0, 0], [1.5e11, 0, 0]], momenta, masses, 1e5, 20000, record_every=100)
+    return 20000
+
+
+@benchmark('steps/s')
+def nbody_binarystar_yoshida4():
+    """The same orbit with ten times larger steps and better energy conservation."""
+    masses = np.array([2e30, 1e30])
+    momenta = np.array([[0, 0, -1e4], [0, 0, 1e4]]) * 2e30
+    nbody.integrate([[-1e11, 0, 0], [1.5e11, 0, 0]], momenta, masses, 1e6, 2000, record_every=100,
+                    method='yoshida4')
+    return 2000
+
+
+@benchmark('interactions/s')
+def nbody_direct_accelerations():
+    rng = np.random.default_rng(0)
+    n = 1000
+    positions, masses = rng.normal(size=(n, 3)) * 1e11, rng.uniform(1e29, 1e30, n)
+    for _ in range(5):
+        nbody.accelerations(positions, masses)
+    return 5 * n * n
+
+
+@benchmark('bodies/s')
+def barnes_hut_accelerations():
+    rng = np.random.default_rng(0)
+    n = 20000
+    positions, masses = rng.normal(size=(n, 3)) * 1e11, rng.uniform(1e29, 1e30, n)
+    Octree(positions, masses).accelerations(0.5)
+    return n
+
+
+@benchmark('steps/s')
+def binarystar_step():
+    """The vpython/vpython_binarystar.py animation loop: one nbody.step per frame, without rendering."""
+    masses = np.array([2e30, 1e30])
+    positions = np.array([[-1e11, 0, 0], [1.5e11, 0, 0]])
+    momenta = np.array([[0, 0, -1e4], [0, 0, 1e4]]) * 2e30
+    for _ in range(5000):
+        positions, momenta = nbody.step(positions, momenta, masses, 1e5, nbody.G, method='verlet')
+    return 5000
+
+
+@benchmark('steps/s')
+def binarystar_run():
+    """The vpython/vpython_binarystar.py --headless run with nbody.run, without checkpoints."""
+    masses = np.array([2e30, 1e30])
+    momenta = np.array([[0, 0, -1e4], [0, 0, 1e4]]) * 2e30
+    nbody.run([[-1e11, 0, 0], [1.5e11, 0, 0]], momenta, masses, 1e5, 20000 * 1e5, G=nbody.G, method='verlet')
+    return 20000
+
+
+def run(function, repeats):
+    """Return (best throughput per second, peak memory in bytes) for one benchmark."""
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        work = function()
+        best = max(best, work / (time.perf_counter() - start))
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', '--keyword', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='fractional slowdown against the baseline that counts as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<28}{'throughput':>22}{'peak memory':>14}{'vs baseline':>13}")
+    for name, unit, function in benchmarks:
+        if args.keyword not in name:
+            continue
+        throughput, peak = run(function, args.repeats)
+        results[name] = {'throughput': throughput, 'unit': unit, 'peak_memory': peak}
+        comparison = ''
+        if name in baseline:
+            ratio = throughput / baseline[name]['throughput']
+            comparison = f"{ratio:0.2f}x"
+            if ratio < 1 - args.tolerance:
+                regressions.append(name)
+                comparison += ' SLOW'
+        print(f"{name:<28}{throughput:>12.4g} {unit:<9}{peak / 1024:>10.0f} KiB{comparison:>13}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline to {args.baseline}")
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
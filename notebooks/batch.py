@@ -0,0 +1,131 @@
+"""Evaluate the standard mission for many candidate starships at once.
+
+The standard mission is the one flown in the Interstellar Planner notebook:
+wait, accelerate by burning a fixed amount of fuel, cruise, decelerate to rest
+at the destination, wait. Every argument may be a scalar or an array of
+quantities (e.g. ``kg * np.array([...])``); arrays are broadcast together and
+the whole batch is evaluated with NumPy on plain SI floats, classically or,
+with relativistic=True, with the rapidity formulas of relativity.py.
+"""
+
+from collections import namedtuple
+
+from scimath.units.length import meters as m
+from scimath.units.length import kilometers as km
+from scimath.units.length import light_year as ly
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+import numpy as np
+
+import relativity
+from starship import c, g, magnitude
+
+BatchResult = namedtuple('BatchResult', ['arrival_time',
+                                         'end_time',
+                                         'cruise_velocity',
+                                         'final_velocity',
+                                         'fuel_remaining',
+                                         'feasible'])
+
+
+def evaluate_missions(payload_mass,
+                      fuel_mass,
+                      burn_fuel_mass,
+                      exhaust_velocity = 500 * km / s,
+                      destination_distance = 4.244 * ly,
+                      wait_before = 0 * s,
+                      wait_after = 0 * s,
+                      acceleration = g,
+                      relativistic = False):
+    """Fly the standard mission for every ship in the batch.
+
+    The ship starts at rest, waits wait_before, burns burn_fuel_mass, cruises
+    until it must start braking, brakes to rest at destination_distance using the
+    same engine, then waits wait_after.
+
+    Args:
+        payload_mass: unit (mass)
+        fuel_mass: unit (mass)
+            Fuel loaded in the single main engine.
+        burn_fuel_mass: unit (mass)
+            Fuel burnt in the departure burn.
+        exhaust_velocity: unit (speed)
+        destination_distance: unit (length)
+        wait_before, wait_after: unit (time)
+        acceleration: unit (acceleration)
+            Acceleration during both burns, the proper acceleration if relativistic.
+        relativistic: bool
+            Use the relativistic rocket equation and constant proper
+            acceleration; there is then no 0.5 c limit and times are
+            coordinate times.
+
+    Returns:
+        BatchResult
+            Per-ship arrival_time (end of the braking burn), end_time, cruise_velocity,
+            final_velocity and fuel_remaining as unit arrays, plus a boolean feasible
+            mask. Ships that cannot make the departure burn, exceed 0.5 c (unless
+            relativistic), or have no room to cruise get NaN everywhere. Ships that run out of fuel while braking
+            burn everything they have and report their residual final_velocity.
+    """
+    payload, fuel, burn, ve, distance, t_before, t_after, accel = np.broadcast_arrays(
+        np.atleast_1d(magnitude(payload_mass, kg)).astype(float),
+        np.atleast_1d(magnitude(fuel_mass, kg)).astype(float),
+        np.atleast_1d(magnitude(burn_fuel_mass, kg)).astype(float),
+        np.atleast_1d(magnitude(exhaust_velocity, m / s)).astype(float),
+        np.atleast_1d(magnitude(destination_distance, m)).astype(float),
+        np.atleast_1d(magnitude(wait_before, s)).astype(float),
+        np.atleast_1d(magnitude(wait_after, s)).astype(float),
+        np.atleast_1d(magnitude(acceleration, m / s**2)).astype(float),
+    )
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        start_mass = payload + fuel
+        fuel_after_departure = fuel - burn
+        braking_mass = payload + fuel_after_departure
+        if relativistic:
+            # Departure burn
+            cruise_rapidity = relativity.burn_rapidity(ve, start_mass / (start_mass - burn))
+            cruise_velocity = relativity.velocity(cruise_rapidity)
+            departure = relativity.constant_proper_acceleration(0.0, cruise_rapidity, accel)
+            departure_time, departure_distance = departure.coordinate_time, departure.distance
+
+            # Braking burn, limited by the fuel that is left
+            needed = braking_mass * -np.expm1(-magnitude(c, m / s) * cruise_rapidity / ve)
+            braking_fuel = np.minimum(needed, fuel_after_departure)
+            braking_rapidity = relativity.burn_rapidity(ve, braking_mass / (braking_mass - braking_fuel))
+            braking = relativity.constant_proper_acceleration(cruise_rapidity, -braking_rapidity, accel)
+            braking_time, braking_distance = braking.coordinate_time, braking.distance
+            final_velocity = relativity.velocity(braking.rapidity)
+        else:
+            # Departure burn
+            cruise_velocity = ve * np.log(start_mass / (start_mass - burn))
+            departure_time = cruise_velocity / accel
+            departure_distance = 0.5 * cruise_velocity * departure_time
+
+            # Braking burn, limited by the fuel that is left
+            needed = braking_mass * -np.expm1(-cruise_velocity / ve)
+            braking_fuel = np.minimum(needed, fuel_after_departure)
+            braking_delta_v = ve * np.log(braking_mass / (braking_mass - braking_fuel))
+            braking_time = braking_delta_v / accel
+            braking_distance = cruise_velocity * braking_time - 0.5 * accel * braking_time ** 2
+            final_velocity = cruise_velocity - braking_delta_v
+
+        cruise_distance = distance - departure_distance - braking_distance
+        cruise_time = cruise_distance / cruise_velocity
+
+    arrival_time = t_before + departure_time + cruise_time + braking_time
+    end_time = arrival_time + t_after
+    fuel_remaining = fuel_after_departure - braking_fuel
+
+    valid = ((burn <= fuel) & (cruise_velocity > 0) & (relativistic | (cruise_velocity / magnitude(c, m / s) <= 0.5))
+             & (cruise_distance >= 0))
+    feasible = valid & (needed <= fuel_after_departure)
+    for values in (arrival_time, end_time, cruise_velocity, final_velocity, fuel_remaining):
+        values[~valid] = np.nan
+
+    return BatchResult(arrival_time=s * arrival_time,
+                       end_time=s * end_time,
+                       cruise_velocity=(m / s) * cruise_velocity,
+                       final_velocity=(m / s) * final_velocity,
+                       fuel_remaining=kg * fuel_remaining,
+                       feasible=feasible)
@@ -0,0 +1,234 @@
+"""Gravity of the Sun, planets and destination star along a Starship's line of flight.
+
+A Starship moves along a line, its position measured from the origin toward
+the destination. A GravityField holds point masses fixed in that frame, the
+line being the x axis, and propagates the ship through the component of
+their pull along the line with the fourth order Yoshida integrator that
+vpython/nbody.py uses for whole systems. Both take the pairwise kernel and
+the integrator weights from vpython/pairwise.py, so vpython/ must be on the
+import path alongside notebooks/, e.g. PYTHONPATH=notebooks:vpython.
+
+Steps are a small fraction of the time to cross the distance to the nearest
+mass or to fall into it, so a leg costs steps in proportion to the logarithm
+of the distance covered rather than the distance itself. Coasting legs leave
+the integrator once every mass's potential is a negligible fraction of the
+kinetic energy, G * M / r < drift_tolerance * v**2 / n for n masses, and
+continue as analytic straight-line drift up to the point where a mass
+becomes significant again, so the light-years between stars cost nothing.
+Burns are likewise evaluated in closed form when they stay clear of every
+mass.
+
+The masses do not move and the ship's transverse motion is ignored: a
+departure is a radial climb out of the Sun's well, not an orbit.
+"""
+
+import math
+
+from scimath.units.length import astronomical_unit as au
+from scimath.units.length import kilometers as km
+from scimath.units.length import light_year as ly
+from scimath.units.length import meters as m
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+import numpy as np
+
+from pairwise import SUBSTEPS, inverse_cube
+from starship import G, magnitude, solar_mass
+
+_G = magnitude(G, m**3 / kg / s**2)
+solar_radius = 6.957e5 * km
+earth_mass = 5.972e24 * kg
+earth_radius = 6371 * km
+jupiter_mass = 1.898e27 * kg
+jupiter_radius = 69911 * km
+
+class GravityField:
+    """Static point masses around a Starship's line of flight, SI units.
+
+    Args:
+        positions: array (n, 3), meters; the ship flies along the x axis
+        masses: array (n,), kilograms
+        radii: array (n,), meters, or None for point masses; a ship
+            reaching a mass's surface has crashed
+        drift_tolerance: float, largest potential of the masses, as a
+            fraction of v**2, at which a coasting ship drifts analytically
+        step_fraction: float, integration step as a fraction of the time to
+            reach the nearest mass
+    """
+    def __init__(self, positions, masses, radii=None, drift_tolerance=1e-6, step_fraction=1e-2):
+        self.positions = np.atleast_2d(np.asarray(positions, dtype=float))
+        self.masses = np.atleast_1d(np.asarray(masses, dtype=float))
+        self.radii = np.zeros(len(self.masses)) if radii is None else np.atleast_1d(np.asarray(radii, dtype=float))
+        self.drift_tolerance = drift_tolerance
+        self.step_fraction = step_fraction
+        self._gm = _G * self.masses
+        self._x = self.positions[:, 0]
+        # Squared distance of each mass from the line
+        self._offset_squared = self.positions[:, 1] ** 2 + self.positions[:, 2] ** 2
+
+    def acceleration(self, x):
+        """Acceleration along the line at position x, meters / second**2"""
+        dx = self._x - x
+        r_squared = dx * dx + self._offset_squared
+        return float(inverse_cube(self._gm, r_squared) @ dx)
+
+    def potential(self, x):
+        """Gravitational potential at position x, joules / kilogram"""
+        return -float(np.sum(self._gm / self._distances(x)))
+
+    def _distances(self, x):
+        return np.sqrt((self._x - x) ** 2 + self._offset_squared)
+
+    def _step(self, x, v):
+        """Step size at x for a ship moving at v, seconds"""
+        r = self._distances(x)
+        crashed = r <= self.radii
+        if crashed.any():
+            raise ValueError(f"The starship crashed into a mass of {self.masses[crashed][0] * kg} at {x * m}.")
+        scale = np.sqrt(r ** 3 / self._gm).min()
+        if v != 0:
+            scale = min(scale, r.min() / abs(v))
+        return self.step_fraction * scale
+
+    def _influence(self, speed):
+        """Radius around each mass inside which a ship at speed must be integrated, meters"""
+        return self._gm * len(self._gm) / (self.drift_tolerance * speed ** 2)
+
+    def _clear(self, start, end, speed):
+        """True if no mass matters to a ship going no slower than speed from start to end."""
+        if speed == 0:
+            return False
+        nearest = np.clip(self._x, min(start, end), max(start, end))
+        return bool(np.all((self._x - nearest) ** 2 + self._offset_squared > self._influence(speed) ** 2))
+
+    def _drift_gap(self, x, v):
+        """Distance a ship at x moving at v drifts before a mass matters, 0 if one does already."""
+        radius = self._influence(abs(v))
+        if np.any(self._distances(x) <= radius):
+            return 0.0
+        crossed = radius ** 2 > self._offset_squared
+        direction = math.copysign(1.0, v)
+        entry = self._x[crossed] - direction * np.sqrt(radius[crossed] ** 2 - self._offset_squared[crossed])
+        ahead = direction * (entry - x)
+        ahead = ahead[ahead > 0]
+        return float(ahead.min()) if len(ahead) else math.inf
+
+    def _kick_drift_kick(self, x, v, a, h, thrust):
+        """Fourth order Yoshida step; a is the field's acceleration at x and the new one is returned."""
+        for weight in SUBSTEPS['yoshida4']:
+            dt = weight * h
+            v += (a + thrust) * (dt / 2)
+            x += v * dt
+            a = self.acceleration(x)
+            v += (a + thrust) * (dt / 2)
+        return x, v, a
+
+    def burn(self, x, v, thrust, duration):
+        """Propagate a ship under constant thrust through the field.
+
+        Args:
+            x: float, meters
+            v: float, meters / second
+            thrust: float, acceleration from the engines along the line, meters / second**2
+            duration: float, seconds
+
+        Returns:
+            (x, v) at the end of the burn
+        """
+        a = self.acceleration(x)
+        left = duration
+        while left > 0:
+            end_v = v + thrust * left
+            slowest = 0.0 if v * end_v <= 0 else min(abs(v), abs(end_v))
+            end_x = x + v * left + 0.5 * thrust * left ** 2
+            if self._clear(x, end_x, slowest):
+                return end_x, end_v
+            h = min(self._step(x, v), left)
+            x, v, a = self._kick_drift_kick(x, v, a, h, thrust)
+            left = 0.0 if h == left else left - h
+        return x, v
+
+    def coast(self, x, v, distance=None, duration=None):
+        """Propagate a coasting ship over a distance or for a duration.
+
+        Args:
+            x: float, meters
+            v: float, meters / second, not 0
+            distance: float, meters to cover in the direction of motion
+            duration: float, seconds, used if distance is None
+
+        Returns:
+            (x, v, elapsed time in seconds) at the end of the coast
+
+        Raises ValueError if the ship turns back before covering distance.
+        Burns and coasts raise ValueError if the ship crashes into a mass.
+        """
+        direction = math.copysign(1.0, v)
+        target = None if distance is None else x + direction * distance
+        elapsed = 0.0
+        a = None
+        drifted = False
+        while True:
+            time_left = math.inf if target is not None else duration - elapsed
+            way_left = math.inf if target is None else direction * (target - x)
+            if time_left <= 0 or way_left <= 0:
+                return x, v, elapsed
+            if not drifted and v != 0:
+                gap = self._drift_gap(x, v)
+                if gap > 0:
+                    covered = min(gap, way_left, abs(v) * time_left)
+                    if covered == way_left:
+                        return target, v, elapsed + covered / abs(v)
+                    if covered < gap:
+                        return x + v * time_left, v, duration
+                    # Reached a mass's influence; integrate from here
+                    x += math.copysign(covered, v)
+                    elapsed += covered / abs(v)
+                    a = None
+                    drifted = True
+                    continue
+            drifted = False
+            if a is None:
+                a = self.acceleration(x)
+            h = min(self._step(x, v), time_left)
+            last = h == time_left
+            if target is not None and direction * (v * h + 0.5 * a * h * h) >= way_left:
+                # Time to the target at the current acceleration
+                u, b = direction * v, direction * a
+                h = 2 * way_left / (u + math.sqrt(u * u + 2 * b * way_left))
+                last = True
+            x, v, a = self._kick_drift_kick(x, v, a, h, 0.0)
+            elapsed += h
+            if target is not None:
+                if last:
+                    return target, v, elapsed
+                if direction * v <= 0:
+                    raise ValueError(f"The starship turned back {abs(target - x) * m} short of the end of the cruise.")
+            elif last:
+                return x, v, duration
+
+
+def solar_departure(destination_distance=4.244 * ly,
+                    departure_radius=1 * au,
+                    destination_mass=solar_mass,
+                    planets=True,
+                    **kwargs):
+    """Field of the Sun and destination star, optionally with the Earth and Jupiter.
+
+    The ship starts at the origin, departure_radius from the Sun on the far
+    side from the destination, 400 km above the Earth when planets is True.
+    The destination star lies 1 au beyond destination_distance. Jupiter is
+    placed at its orbital radius, perpendicular to the line of flight.
+    Both stars have the radius of the Sun. Other keyword arguments are
+    passed on to GravityField.
+    """
+    sun = -magnitude(departure_radius, m)
+    positions = [[sun, 0.0, 0.0], [magnitude(destination_distance + 1 * au, m), 0.0, 0.0]]
+    masses = [magnitude(solar_mass, kg), magnitude(destination_mass, kg)]
+    radii = [magnitude(solar_radius, m)] * 2
+    if planets:
+        positions += [[-magnitude(earth_radius + 400 * km, m), 0.0, 0.0],
+                      [sun, magnitude(5.2 * au, m), 0.0]]
+        masses += [magnitude(earth_mass, kg), magnitude(jupiter_mass, kg)]
+        radii += [magnitude(earth_radius, m), magnitude(jupiter_radius, m)]
+    return GravityField(np.array(positions), np.array(masses), np.array(radii), **kwargs)
@@ -0,0 +1,117 @@
+"""Columnar storage for a Starship's mission log."""
+
+from collections import namedtuple
+import csv
+
+from scimath.units.length import meters as m
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+import numpy as np
+
+
+class MessageTemplate(namedtuple('MessageTemplate', ['text', 'scales'])):
+    """A log message whose arguments are recorded as SI floats.
+
+    Each argument is divided by its scale (None to leave it as is) only when
+    the message is formatted, so recording one costs no unit conversions.
+    """
+    __slots__ = ()
+
+    def format(self, *args):
+        return self.text.format(*(a if u is None else a / u for a, u in zip(args, self.scales)))
+
+
+class MissionHistory:
+    """Mission log stored as preallocated float columns.
+
+    Columns are time (s), position (m), velocity (m/s) and fuel_mass (kg).
+    Storage doubles whenever it fills up, so appending is amortized O(1).
+    Messages are kept as a template (a str or MessageTemplate) and its
+    arguments and only formatted when they are read.
+    """
+    columns = ('time', 'position', 'velocity', 'fuel_mass')
+    units = (s, m, m / s, kg)
+
+    def __init__(self, capacity: int = 16):
+        self._data = np.empty((len(self.columns), capacity))
+        self._size = 0
+        self._templates = list()
+        self._arguments = list()
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        """Return entry index as a dict of unit quantities, or a list of them for a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        return {name: float(self._data[i, index]) * u
+                for i, (name, u) in enumerate(zip(self.columns, self.units))}
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
+    def append(self, time, position, velocity, fuel_mass, message: str = '', *args):
+        """Append one entry. Values are SI floats; message is formatted with args when read."""
+        if self._size == self._data.shape[1]:
+            grown = np.empty((self._data.shape[0], max(2 * self._size, 1)))
+            grown[:, :self._size] = self._data[:, :self._size]
+            self._data = grown
+        self._data[:, self._size] = (time, position, velocity, fuel_mass)
+        self._size += 1
+        self._templates.append(message)
+        self._arguments.append(args)
+
+    def extend(self, time, position, velocity, fuel_mass):
+        """Append entries without messages from equal length arrays of SI floats."""
+        count = len(time)
+        if self._size + count > self._data.shape[1]:
+            grown = np.empty((self._data.shape[0], max(2 * self._data.shape[1], self._size + count)))
+            grown[:, :self._size] = self._data[:, :self._size]
+            self._data = grown
+        self._data[:, self._size:self._size + count] = (time, position, velocity, fuel_mass)
+        self._size += count
+        self._templates.extend([''] * count)
+        self._arguments.extend([()] * count)
+
+    def column(self, name):
+        """Return a read-only view of the named column, in SI units."""
+        view = self._data[self.columns.index(name), :self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def time(self):
+        return self.column('time')
+
+    @property
+    def position(self):
+        return self.column('position')
+
+    @property
+    def velocity(self):
+        return self.column('velocity')
+
+    @property
+    def fuel_mass(self):
+        return self.column('fuel_mass')
+
+    def message(self, index):
+        template, args = self._templates[index], self._arguments[index]
+        return template.format(*args) if args else template
+
+    def messages(self):
+        return [self.message(index) for index in range(self._size)]
+
+    def write_csv(self, path):
+        """Write the history to path as CSV, one row per entry, with SI columns and the formatted message."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['time (s)', 'position (m)', 'velocity (m/s)', 'fuel_mass (kg)', 'message'])
+            for index in range(self._size):
+                writer.writerow(list(self._data[:, index]) + [self.message(index)])
@@ -0,0 +1,209 @@
+"""Optimal fuel allocation across engines for the accelerate, cruise, brake profile.
+
+A ship carrying several engines burns some fuel from each, in the order of
+the engines dict, to reach its cruise velocity v. It coasts, then burns from
+each again, in the same order, to brake to rest at the destination. Every
+burn runs at the same acceleration a, so the trip time depends only on v:
+
+    T = v / a + D / v        (while v**2 <= a * D)
+
+and the problem is to choose the 2 * n burns. Only the fuel that is burnt is
+loaded and every engine is carried the whole way, so the mass at each burn
+is the payload, the engines' dry mass and the fuel still to burn, and the
+rocket equation for burn k,
+
+    delta_v_k = ve_k * log(1 + x_k / M_k),    M_k = payload + dry + sum of x_j for j > k,
+
+has the analytic gradient
+
+    d delta_v_k / d x_k = ve_k / (M_k + x_k)
+    d delta_v_k / d x_j = ve_k * (1 / (M_k + x_k) - 1 / M_k)    for j > k
+
+(and 0 for j < k); the dry mass is a constant and adds nothing else to the
+gradient. With exact gradients SLSQP solves the constrained
+problem in a handful of iterations instead of thousands of simulations.
+"""
+
+from collections import namedtuple
+import math
+
+from scimath.units.length import meters as m
+from scimath.units.length import light_year as ly
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+import numpy as np
+from scipy.optimize import minimize
+
+from starship import Engine, Starship, c, g, magnitude
+
+MissionPlan = namedtuple('MissionPlan', ['arrival_time',
+                                         'cruise_velocity',
+                                         'departure_fuel',
+                                         'braking_fuel',
+                                         'fuel_mass',
+                                         'iterations'])
+
+_c = magnitude(c, m / s)
+
+
+def burn_velocities(burns, exhaust_velocities, payload_mass):
+    """Change in velocity of each of a sequence of burns, and its Jacobian.
+
+    Args:
+        burns: array (k,), fuel burnt by each burn in order, kg
+        exhaust_velocities: array (k,), m/s
+        payload_mass: float, mass left after the last burn, kg
+
+    Returns:
+        (delta_v (k,) in m/s, jacobian (k, k) of delta_v with respect to burns)
+    """
+    # Mass after each burn: the payload plus all later burns
+    after = payload_mass + np.append(np.cumsum(burns[::-1])[::-1][1:], 0.0)
+    before = after + burns
+    delta_v = exhaust_velocities * np.log(before / after)
+    jacobian = np.triu(np.outer(exhaust_velocities, np.ones(len(burns)))
+                       * (1 / before - 1 / after)[:, np.newaxis], 1)
+    jacobian[np.diag_indices(len(burns))] = exhaust_velocities / before
+    return delta_v, jacobian
+
+
+class MissionOptimizer:
+    """Burn allocations across engines that minimize trip time or fuel.
+
+    Args:
+        payload_mass: unit (mass)
+        engines: dict of Engine, fired in order; each engine's fuel_mass is
+            the capacity of its tanks and its exhaust_velocity and dry_mass
+            are used
+        destination_distance: unit (length)
+        max_acceleration: unit (acceleration), the acceleration of every burn
+        total_fuel: unit (mass) or None, a limit on all the fuel loaded
+    """
+    def __init__(self,
+                 payload_mass,
+                 engines: dict,
+                 destination_distance = 4.244 * ly,
+                 max_acceleration = g,
+                 total_fuel = None):
+        self.payload_mass = magnitude(payload_mass, kg)
+        self.engine_names = list(engines)
+        self.capacity = np.array([e._fuel_mass for e in engines.values()])
+        self.exhaust_velocity = np.array([e._exhaust_velocity for e in engines.values()])
+        self.dry_mass = np.array([e._dry_mass for e in engines.values()])
+        # Mass carried after the last burn
+        self._empty_mass = self.payload_mass + self.dry_mass.sum()
+        self.destination_distance = magnitude(destination_distance, m)
+        self.acceleration = magnitude(max_acceleration, m / s**2)
+        self.total_fuel = None if total_fuel is None else magnitude(total_fuel, kg)
+        # Problem scales, so that SLSQP sees numbers of order one
+        self._fuel_scale = self.capacity.sum() if self.total_fuel is None else min(self.total_fuel,
+                                                                                   self.capacity.sum())
+        self._velocity_scale = self.exhaust_velocity.max()
+        self._time_scale = 2 * math.sqrt(self.destination_distance / self.acceleration)
+
+    def _velocities(self, u):
+        """Departure and braking velocity and their gradients for scaled burns u."""
+        n = len(self.engine_names)
+        delta_v, jacobian = burn_velocities(u * self._fuel_scale, np.tile(self.exhaust_velocity, 2),
+                                            self._empty_mass)
+        jacobian *= self._fuel_scale
+        return (delta_v[:n].sum(), jacobian[:n].sum(axis=0),
+                delta_v[n:].sum(), jacobian[n:].sum(axis=0))
+
+    def _trip_time(self, v):
+        return v / self.acceleration + self.destination_distance / v
+
+    def _time_terms(self, u):
+        """Scaled trip time and its gradient."""
+        v, dv, _, _ = self._velocities(u)
+        v = max(v, 1e-9 * self._velocity_scale)
+        slope = 1 / self.acceleration - self.destination_distance / v ** 2
+        return self._trip_time(v) / self._time_scale, slope * dv / self._time_scale
+
+    def _constraints(self):
+        n = len(self.engine_names)
+        selection = np.hstack([np.eye(n), np.eye(n)])
+        velocity_limit = min(math.sqrt(self.acceleration * self.destination_distance), 0.5 * _c)
+
+        def arrive_at_rest(u):
+            v, _, w, _ = self._velocities(u)
+            return (v - w) / self._velocity_scale
+
+        def arrive_at_rest_gradient(u):
+            _, dv, _, dw = self._velocities(u)
+            return (dv - dw) / self._velocity_scale
+
+        def velocity_room(u):
+            return (velocity_limit - self._velocities(u)[0]) / self._velocity_scale
+
+        def velocity_room_gradient(u):
+            return -self._velocities(u)[1] / self._velocity_scale
+
+        constraints = [
+            {'type': 'eq', 'fun': arrive_at_rest, 'jac': arrive_at_rest_gradient},
+            # Room to cruise before braking, and non-relativistic
+            {'type': 'ineq', 'fun': velocity_room, 'jac': velocity_room_gradient},
+            # Tank capacities
+            {'type': 'ineq', 'fun': lambda u: self.capacity / self._fuel_scale - selection @ u,
+             'jac': lambda u: -selection},
+        ]
+        if self.total_fuel is not None:
+            constraints.append({'type': 'ineq', 'fun': lambda u: np.array([self.total_fuel / self._fuel_scale - u.sum()]),
+                                'jac': lambda u: -np.ones((1, len(u)))})
+        return constraints
+
+    def _solve(self, objective, constraints):
+        n = len(self.engine_names)
+        start = np.tile(self.capacity / self.capacity.sum(), 2) * 0.25
+        result = minimize(objective, start, jac=True, method='SLSQP', bounds=[(0, None)] * (2 * n),
+                          constraints=constraints, options={'ftol': 1e-12, 'maxiter': 200})
+        if not result.success:
+            raise ValueError(f"No feasible mission for these constraints: {result.message}")
+        burns = np.maximum(result.x, 0) * self._fuel_scale
+        v = self._velocities(result.x)[0]
+        return MissionPlan(arrival_time=self._trip_time(v) * s,
+                           cruise_velocity=v * m / s,
+                           departure_fuel={name: burn * kg for name, burn in zip(self.engine_names, burns[:n])},
+                           braking_fuel={name: burn * kg for name, burn in zip(self.engine_names, burns[n:])},
+                           fuel_mass=burns.sum() * kg,
+                           iterations=result.nit)
+
+    def minimize_time(self):
+        """Return the MissionPlan that arrives soonest within the fuel constraints."""
+        return self._solve(self._time_terms, self._constraints())
+
+    def minimize_fuel(self, trip_time):
+        """Return the MissionPlan that arrives within trip_time burning the least fuel."""
+        deadline = magnitude(trip_time, s) / self._time_scale
+
+        def objective(u):
+            return u.sum(), np.ones(len(u))
+
+        def on_time(u):
+            return deadline - self._time_terms(u)[0]
+
+        def on_time_gradient(u):
+            return -self._time_terms(u)[1]
+
+        constraints = self._constraints() + [{'type': 'ineq', 'fun': on_time, 'jac': on_time_gradient}]
+        return self._solve(objective, constraints)
+
+    def fly(self, plan, **kwargs):
+        """Fly plan in a Starship loaded with exactly the planned fuel and return the ship.
+
+        Other keyword arguments are passed on to Starship.
+        """
+        engines = {name: Engine(plan.departure_fuel[name] + plan.braking_fuel[name],
+                                exhaust_velocity=ve * m / s, dry_mass=dry * kg)
+                   for name, ve, dry in zip(self.engine_names, self.exhaust_velocity, self.dry_mass)}
+        ss = Starship(self.payload_mass * kg, engines, destination_distance=self.destination_distance * m,
+                      **kwargs)
+        acceleration = self.acceleration * m / s**2
+        for name in self.engine_names:
+            ss.accelerate(name, fuel_mass=plan.departure_fuel[name], acceleration=acceleration)
+        ss.cruise(self.destination_distance * m - 2 * ss.position)
+        for name in self.engine_names:
+            # What is left in the tank, which rounding may have made a hair less than planned
+            fuel = min(magnitude(plan.braking_fuel[name], kg), ss.engines[name]._fuel_mass)
+            ss.accelerate(name, fuel_mass=fuel * kg, decelerate=True, acceleration=acceleration)
+        return ss
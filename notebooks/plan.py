@@ -0,0 +1,268 @@
+"""Declarative mission plans, compiled once and flown by any number of Starships.
+
+A plan is a list of steps, written as YAML or JSON (or the equivalent dict):
+
+    name: standard mission
+    steps:
+      - wait: 10 yr
+      - accelerate: {fuel_mass: 900 kg}
+      - cruise: symmetric
+      - accelerate: {decelerate: true}
+
+The steps are the Starship maneuvers:
+
+    accelerate: engine (default main), one of target_velocity (default 0),
+        fuel_mass or fuel_fraction (of the fuel left in the engine),
+        decelerate (default false) and acceleration (default 1 g)
+    cruise: a distance, {to: position} ahead of the ship in its
+        direction of travel, or symmetric, which cruises up to
+        the point as far from the destination as the ship is from the
+        origin, leaving room to brake as it accelerated
+    wait: a time
+    jettison: an engine name
+
+Quantities are a number and a unit name from UNITS, such as '900 kg' or
+'0.1 c', or a bare number in SI units. A step may also be written as a
+dict with the maneuver's name under 'op', e.g. {op: wait, time: 10 yr}.
+
+compile_plan checks and converts everything once into a CompiledPlan, a
+tuple of (op code, SI float arguments) that is small, picklable and holds
+no unit objects. CompiledPlan.execute flies it with the Starship's SI float
+kernels, whatever check_units says, so a plan is parsed once however many
+ships fly it. Compiling the same text again is served from a cache.
+"""
+
+from functools import lru_cache
+import json
+
+from scimath.units.length import astronomical_unit as au
+from scimath.units.length import kilometers as km
+from scimath.units.length import light_year as ly
+from scimath.units.length import meters as m
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+from scimath.units.time import years as yr
+
+from starship import c, g, magnitude
+
+UNITS = {'s': s, 'yr': yr,
+         'm': m, 'km': km, 'au': au, 'ly': ly,
+         'kg': kg,
+         'm/s': m / s, 'km/s': km / s, 'c': c,
+         'm/s**2': m / s**2, 'g': g}
+
+# Op codes, indices into _HANDLERS
+ACCELERATE, CRUISE, CRUISE_TO, CRUISE_SYMMETRIC, WAIT, JETTISON = range(6)
+
+# Step fields: name -> (dimension the quantity must have, or None, default)
+_ACCELERATE_FIELDS = {'engine': (None, 'main'),
+                      'target_velocity': (m / s, 0.0),
+                      'fuel_mass': (kg, None),
+                      'fuel_fraction': (None, None),
+                      'decelerate': (None, False),
+                      'acceleration': (m / s**2, magnitude(g, m / s**2))}
+
+
+def _accelerate(ship, engine_name, target_velocity, fuel_mass, fuel_fraction, decelerate, acceleration):
+    if fuel_fraction is not None:
+        fuel_mass = fuel_fraction * ship.engines[engine_name]._fuel_mass
+    ship._accelerate(engine_name, target_velocity, fuel_mass, decelerate, acceleration)
+
+
+def _cruise(ship, distance):
+    ship._cruise(distance)
+
+
+def _cruise_to(ship, position):
+    distance = position - ship._position
+    if distance * ship._velocity < 0:
+        raise ValueError(f"Can't cruise to {position * m}, behind the ship at {ship.position}.")
+    ship._cruise(abs(distance))
+
+
+def _cruise_symmetric(ship):
+    ship._cruise(ship._destination_distance - 2 * ship._position)
+
+
+def _wait(ship, time):
+    ship._wait(time)
+
+
+def _jettison(ship, engine_name):
+    ship.jettison(engine_name)
+
+
+_HANDLERS = (_accelerate, _cruise, _cruise_to, _cruise_symmetric, _wait, _jettison)
+
+
+class CompiledPlan:
+    """A mission plan compiled to op codes and SI float arguments.
+
+    Args:
+        ops: tuple of (op code, tuple of arguments)
+        name: str
+    """
+    __slots__ = ('ops', 'name')
+
+    def __init__(self, ops, name=''):
+        self.ops = tuple(ops)
+        self.name = name
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __eq__(self, other):
+        return isinstance(other, CompiledPlan) and self.ops == other.ops
+
+    def __hash__(self):
+        return hash(self.ops)
+
+    def __reduce__(self):
+        return CompiledPlan, (self.ops, self.name)
+
+    def __repr__(self):
+        return f"CompiledPlan({self.name!r}, {len(self.ops)} ops)"
+
+    def execute(self, ship):
+        """Fly the plan from the ship's current state and return the ship.
+
+        Raises whatever the Starship raises for a maneuver it cannot fly.
+        """
+        for op, args in self.ops:
+            _HANDLERS[op](ship, *args)
+        return ship
+
+
+def _quantity(value, units, where):
+    """SI magnitude in units of a number or a 'number unit' string; units None for a pure number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{where}: expected a quantity, got {value!r}.")
+    if not isinstance(value, str):
+        return float(value)
+    number, _, unit_name = value.strip().partition(' ')
+    unit_name = unit_name.strip()
+    try:
+        number = float(number)
+    except ValueError:
+        raise ValueError(f"{where}: {value!r} does not start with a number.") from None
+    if not unit_name:
+        return number
+    if units is None:
+        raise ValueError(f"{where}: expected a number, got {value!r}.")
+    if unit_name not in UNITS:
+        raise ValueError(f"{where}: unknown unit {unit_name!r} in {value!r}; use one of {', '.join(UNITS)}.")
+    try:
+        return float(magnitude(number * UNITS[unit_name], units))
+    except ValueError:
+        raise ValueError(f"{where}: {value!r} is not in units of {units}.") from None
+
+
+def _compile_step(step, index):
+    where = f"step {index + 1}"
+    if not isinstance(step, dict):
+        raise ValueError(f"{where}: expected a mapping, got {step!r}.")
+    if 'op' in step:
+        op, fields = step['op'], {k: v for k, v in step.items() if k != 'op'}
+    elif len(step) == 1:
+        (op, fields), = step.items()
+    else:
+        raise ValueError(f"{where}: expected one maneuver, got {', '.join(map(str, step))}.")
+    where = f"{where} ({op})"
+
+    if op == 'accelerate':
+        fields = {} if fields is None else fields
+        if not isinstance(fields, dict):
+            raise ValueError(f"{where}: expected a mapping of arguments, got {fields!r}.")
+        unknown = set(fields) - set(_ACCELERATE_FIELDS)
+        if unknown:
+            raise ValueError(f"{where}: unknown arguments {', '.join(sorted(unknown))}.")
+        if 'fuel_mass' in fields and 'fuel_fraction' in fields:
+            raise ValueError(f"{where}: give fuel_mass or fuel_fraction, not both.")
+        args = []
+        for name, (units, default) in _ACCELERATE_FIELDS.items():
+            value = fields.get(name, default)
+            if value is not None and units is not None:
+                value = _quantity(value, units, f"{where} {name}")
+            args.append(value)
+        engine, _, _, fraction, decelerate, acceleration = args
+        if not isinstance(engine, str) or not isinstance(decelerate, bool):
+            raise ValueError(f"{where}: engine must be a name and decelerate true or false.")
+        if fraction is not None:
+            args[3] = _quantity(fraction, None, f"{where} fuel_fraction")
+            if not 0 <= args[3] <= 1:
+                raise ValueError(f"{where}: fuel_fraction must be between 0 and 1, got {fraction!r}.")
+        if acceleration <= 0:
+            raise ValueError(f"{where}: acceleration must be positive.")
+        return ACCELERATE, tuple(args)
+    if op == 'cruise':
+        if fields == 'symmetric':
+            return CRUISE_SYMMETRIC, ()
+        if isinstance(fields, dict):
+            if set(fields) == {'to'}:
+                return CRUISE_TO, (_quantity(fields['to'], m, f"{where} to"),)
+            if set(fields) == {'distance'}:
+                fields = fields['distance']
+            else:
+                raise ValueError(f"{where}: expected distance, to or symmetric.")
+        return CRUISE, (_quantity(fields, m, where),)
+    if op == 'wait':
+        if isinstance(fields, dict):
+            if set(fields) != {'time'}:
+                raise ValueError(f"{where}: expected a time.")
+            fields = fields['time']
+        return WAIT, (_quantity(fields, s, where),)
+    if op == 'jettison':
+        if isinstance(fields, dict):
+            fields = fields.get('engine')
+        if not isinstance(fields, str):
+            raise ValueError(f"{where}: expected an engine name.")
+        return JETTISON, (fields,)
+    raise ValueError(f"{where}: unknown maneuver; use accelerate, cruise, wait or jettison.")
+
+
+def _parse(text):
+    """Plan dict or list from YAML text, or JSON text if PyYAML is not installed."""
+    try:
+        import yaml
+    except ImportError:
+        return json.loads(text)
+    return yaml.safe_load(text)
+
+
+@lru_cache(maxsize=4096)
+def _compile_text(text):
+    return compile_plan(_parse(text))
+
+
+def compile_plan(plan):
+    """Compile a mission plan once for any number of Starships.
+
+    Args:
+        plan: dict with a list of 'steps' (and optionally a 'name'), a list
+            of steps, or the YAML or JSON text of either
+
+    Returns:
+        CompiledPlan
+
+    Raises ValueError, naming the step, for anything the plan gets wrong.
+    """
+    if isinstance(plan, CompiledPlan):
+        return plan
+    if isinstance(plan, str):
+        return _compile_text(plan)
+    name = ''
+    if isinstance(plan, dict):
+        name = str(plan.get('name', ''))
+        plan = plan.get('steps')
+    if not isinstance(plan, list):
+        raise ValueError(f"Expected a list of steps, got {plan!r}.")
+    return CompiledPlan([_compile_step(step, i) for i, step in enumerate(plan)], name)
+
+
+def load_plan(path):
+    """Compile the mission plan in a .yaml, .yml or .json file."""
+    with open(path) as f:
+        text = f.read()
+    if path.endswith('.json'):
+        return compile_plan(json.loads(text))
+    return compile_plan(text)
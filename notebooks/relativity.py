@@ -0,0 +1,90 @@
+"""Relativistic rocket kinematics in rapidity space.
+
+The rapidity eta of a ship moving at v is artanh(v / c). Rapidities add
+along a line where velocities do not, so the relativistic rocket equation is
+as simple as the classical one:
+
+    delta_eta = (ve / c) * log(m_initial / m_final)
+
+and a burn at constant proper acceleration a (what the crew feels) changes
+the rapidity at the steady rate a / c per unit of proper time. From eta0 to
+eta1 = eta0 + delta_eta, with eta_mid = (eta0 + eta1) / 2:
+
+    proper time:      tau = c * |delta_eta| / a
+    coordinate time:  t = (c / a) * |sinh(eta1) - sinh(eta0)|
+                        = (2 c / a) * cosh(eta_mid) * sinh(|delta_eta| / 2)
+    distance:         x = (c**2 / a) * sign(delta_eta) * (cosh(eta1) - cosh(eta0))
+                        = (2 c**2 / a) * sinh(eta_mid) * sinh(|delta_eta| / 2)
+
+The product forms do not cancel, so they stay accurate for short burns and
+for ships arbitrarily close to c, where v itself rounds to c but the
+rapidity does not. Every function works on SI floats or NumPy arrays
+broadcast together, so whole batches are evaluated at once.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+_c = 299792458.0
+
+RelativisticBurn = namedtuple('RelativisticBurn', ['coordinate_time', 'proper_time', 'distance', 'rapidity'])
+
+
+def rapidity(velocity):
+    """Rapidity (dimensionless) of a velocity in meters / second, |velocity| < c"""
+    return np.arctanh(np.divide(velocity, _c))
+
+
+def velocity(rapidity):
+    """Velocity in meters / second of a rapidity"""
+    return _c * np.tanh(rapidity)
+
+
+def lorentz_factor(rapidity):
+    """Lorentz factor gamma = 1 / sqrt(1 - v**2 / c**2) of a rapidity"""
+    return np.cosh(rapidity)
+
+
+def burn_rapidity(exhaust_velocity, mass_ratio):
+    """Change in rapidity from burning down to 1 / mass_ratio of the starting mass.
+
+    Args:
+        exhaust_velocity: float or array, meters / second, at most c
+        mass_ratio: float or array, initial mass / final mass
+    """
+    return np.divide(exhaust_velocity, _c) * np.log(mass_ratio)
+
+
+def mass_ratio(exhaust_velocity, delta_rapidity):
+    """Initial mass / final mass needed for a change in rapidity of either sign"""
+    return np.exp(_c * np.abs(delta_rapidity) / exhaust_velocity)
+
+
+def constant_proper_acceleration(initial_rapidity, delta_rapidity, acceleration):
+    """Burn at constant proper acceleration, toward the destination if delta_rapidity > 0.
+
+    Args:
+        initial_rapidity: float or array
+        delta_rapidity: float or array
+        acceleration: float or array, proper acceleration, meters / second**2
+
+    Returns:
+        RelativisticBurn of the coordinate_time and proper_time (seconds),
+        distance (meters, signed) and final rapidity
+    """
+    final = initial_rapidity + delta_rapidity
+    middle = initial_rapidity + 0.5 * delta_rapidity
+    half = np.sinh(0.5 * np.abs(delta_rapidity))
+    scale = _c / acceleration
+    return RelativisticBurn(coordinate_time=2 * scale * np.cosh(middle) * half,
+                            proper_time=scale * np.abs(delta_rapidity),
+                            distance=2 * scale * _c * np.sinh(middle) * half,
+                            rapidity=final)
+
+
+def coast(rapidity, distance):
+    """Coordinate and proper time, seconds, to coast distance meters at a rapidity"""
+    coordinate_time = np.abs(np.divide(distance, _c * np.tanh(rapidity)))
+    proper_time = np.abs(np.divide(distance, _c * np.sinh(rapidity)))
+    return coordinate_time, proper_time
@@ -0,0 +1,71 @@
+"""Precomputed mass ratio <-> delta-v tables for the rocket equation.
+
+For an exhaust velocity ve the rocket equation relates delta_v and the mass
+ratio R = m_initial / m_final by R = exp(delta_v / ve). A RocketTable samples
+that curve once on a uniform grid of x = delta_v / ve with spacing h and
+answers both directions by linear interpolation. The table is
+dimensionless, so a single one serves every exhaust velocity, scaled by ve
+on lookup. Because exp'' = exp, the relative error in R and the absolute
+error in x are both at most (h**2 / 8) * exp(h) (stored as
+RocketTable.error_bound); outside the table the exact functions are used.
+
+Engines built with use_table=True share that one table and cache
+set_target_delta_v fuel requests keyed by
+(exhaust_velocity, starship_mass, delta_v).
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+import math
+
+import numpy as np
+
+
+class RocketTable:
+    """Interpolated rocket equation in units of the exhaust velocity (SI floats)."""
+    def __init__(self, max_mass_ratio = 1e6, points = 65537):
+        self.max_x = math.log(max_mass_ratio)
+        self.step = self.max_x / (points - 1)
+        self.error_bound = self.step ** 2 / 8 * math.exp(self.step)
+        self.x = np.linspace(0, self.max_x, points)
+        self.mass_ratios = np.exp(self.x)
+        self._x = self.x.tolist()
+        self._mass_ratios = self.mass_ratios.tolist()
+
+    def mass_ratio(self, delta_v, exhaust_velocity):
+        """Return exp(|delta_v| / exhaust_velocity) for a float or array of delta_v in m/s."""
+        if not isinstance(delta_v, float):
+            x = np.abs(delta_v) / exhaust_velocity
+            return np.where(x <= self.max_x, np.interp(x, self.x, self.mass_ratios), np.exp(x))
+        x = abs(delta_v) / exhaust_velocity
+        if x > self.max_x:
+            return math.exp(x)
+        i = min(int(x / self.step), len(self._x) - 2)
+        r0 = self._mass_ratios[i]
+        return r0 + (self._mass_ratios[i + 1] - r0) * (x - self._x[i]) / self.step
+
+    def delta_v(self, mass_ratio, exhaust_velocity):
+        """Return exhaust_velocity * log(mass_ratio) for a float or array of mass ratios >= 1."""
+        if not isinstance(mass_ratio, float):
+            x = np.where(mass_ratio <= self._mass_ratios[-1],
+                         np.interp(mass_ratio, self.mass_ratios, self.x),
+                         np.log(mass_ratio))
+            return exhaust_velocity * x
+        if mass_ratio > self._mass_ratios[-1]:
+            return exhaust_velocity * math.log(mass_ratio)
+        i = min(max(bisect_right(self._mass_ratios, mass_ratio) - 1, 0), len(self._x) - 2)
+        r0 = self._mass_ratios[i]
+        x = self._x[i] + self.step * (mass_ratio - r0) / (self._mass_ratios[i + 1] - r0)
+        return exhaust_velocity * x
+
+
+@lru_cache(maxsize=None)
+def rocket_table():
+    """Return the shared RocketTable, built on first use."""
+    return RocketTable()
+
+
+@lru_cache(maxsize=4096)
+def fuel_for_delta_v(exhaust_velocity, starship_mass, delta_v):
+    """Return the fuel in kg a ship of starship_mass kg burns to change velocity by delta_v m/s."""
+    return starship_mass - starship_mass / rocket_table().mass_ratio(delta_v, exhaust_velocity)
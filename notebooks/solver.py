@@ -0,0 +1,130 @@
+"""Closed-form solutions of the accelerate, cruise, decelerate mission profile.
+
+For a ship that burns to a cruise velocity v, coasts, and brakes to rest at
+the destination using the same engine, the rocket equation gives everything
+analytically:
+
+    departure burn:  m1 = m0 * exp(-v / ve)
+    braking burn:    m2 = m1 * exp(-v / ve) = m0 * exp(-2 v / ve)
+    trip time:       T = v / a + D / v          (while v**2 <= a * D)
+
+so arrival time, peak velocity and the fuel split can be read off directly,
+and the inverse problems (fuel for a trip time, velocity for a fuel budget)
+are one square root or logarithm away.
+"""
+
+from collections import namedtuple
+import math
+
+from scimath.units.length import meters as m
+from scimath.units.length import kilometers as km
+from scimath.units.length import light_year as ly
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+
+from starship import c, g, magnitude
+
+MissionSolution = namedtuple('MissionSolution', ['arrival_time',
+                                                 'peak_velocity',
+                                                 'departure_fuel',
+                                                 'braking_fuel',
+                                                 'fuel_remaining'])
+
+_c = magnitude(c, m / s)
+
+
+class MissionSolver:
+    """Analytic planner for a ship with a single engine flying the standard profile.
+
+    The ship starts at rest, accelerates at a constant acceleration, cruises,
+    and brakes to rest exactly at destination_distance. Times are measured
+    from the start of the departure burn. Units are converted once, here;
+    every query is then a few floating point operations.
+    """
+    def __init__(self,
+                 payload_mass,
+                 fuel_mass,
+                 exhaust_velocity = 500 * km / s,
+                 destination_distance = 4.244 * ly,
+                 acceleration = g):
+        self.payload_mass = magnitude(payload_mass, kg)
+        self.fuel_mass = magnitude(fuel_mass, kg)
+        self.exhaust_velocity = magnitude(exhaust_velocity, m / s)
+        self.destination_distance = magnitude(destination_distance, m)
+        self.acceleration = magnitude(acceleration, m / s**2)
+
+    def _check_velocity(self, velocity):
+        if velocity > 0.5 * _c:
+            raise NotImplementedError("This ship is travelling at reletivistic speeds. This is not currently supported.")
+        if velocity ** 2 > self.acceleration * self.destination_distance:
+            raise ValueError(f"A cruise velocity of {velocity * m / s} leaves no room to cruise before braking.")
+
+    def _trip_time(self, velocity):
+        return velocity / self.acceleration + self.destination_distance / velocity
+
+    def _solution(self, velocity, departure_fuel):
+        self._check_velocity(velocity)
+        start_mass = self.payload_mass + self.fuel_mass
+        braking_fuel = (start_mass - departure_fuel) * -math.expm1(-velocity / self.exhaust_velocity)
+        fuel_remaining = self.fuel_mass - departure_fuel - braking_fuel
+        if fuel_remaining < -1e-12 * self.fuel_mass:
+            raise ValueError(f"Not enough fuel to brake from {velocity * m / s}. Short by {-fuel_remaining * kg}.")
+        fuel_remaining = max(fuel_remaining, 0.0)
+        return MissionSolution(arrival_time=self._trip_time(velocity) * s,
+                               peak_velocity=velocity * m / s,
+                               departure_fuel=departure_fuel * kg,
+                               braking_fuel=braking_fuel * kg,
+                               fuel_remaining=fuel_remaining * kg)
+
+    def solve(self, burn_fuel_mass):
+        """Return the MissionSolution when burn_fuel_mass is burnt on departure."""
+        burn = magnitude(burn_fuel_mass, kg)
+        if not 0 < burn <= self.fuel_mass:
+            raise ValueError(f"Not enough fuel for this maneuver. Requested {burn_fuel_mass} of {self.fuel_mass * kg}.")
+        start_mass = self.payload_mass + self.fuel_mass
+        velocity = self.exhaust_velocity * math.log(start_mass / (start_mass - burn))
+        return self._solution(velocity, burn)
+
+    def solve_velocity(self, cruise_velocity):
+        """Return the MissionSolution for a given cruise (peak) velocity."""
+        velocity = magnitude(cruise_velocity, m / s)
+        start_mass = self.payload_mass + self.fuel_mass
+        departure_fuel = start_mass * -math.expm1(-velocity / self.exhaust_velocity)
+        return self._solution(velocity, departure_fuel)
+
+    def max_velocity(self):
+        """Return the highest cruise velocity the ship can still brake from."""
+        start_mass = self.payload_mass + self.fuel_mass
+        return 0.5 * self.exhaust_velocity * math.log(start_mass / self.payload_mass) * m / s
+
+    def fastest(self):
+        """Return the MissionSolution with the shortest trip time the fuel allows.
+
+        Trip time falls with cruise velocity up to sqrt(acceleration * distance),
+        where the cruise phase vanishes, and the solver does not go past 0.5 c.
+        """
+        velocity = min(self.max_velocity() / (m / s),
+                       math.sqrt(self.acceleration * self.destination_distance),
+                       0.5 * _c)
+        return self.solve_velocity(velocity * m / s)
+
+    def min_fuel_for_trip_time(self, trip_time):
+        """Return the least fuel mass that completes the trip within trip_time.
+
+        The slowest cruise velocity meeting the deadline is the smaller root of
+        v**2 / a - T v + D = 0, and the fuel that just brakes to rest from it
+        is payload_mass * (exp(2 v / ve) - 1). The fuel_mass given to this
+        solver is not used.
+        """
+        duration = magnitude(trip_time, s)
+        discriminant = duration ** 2 - 4 * self.destination_distance / self.acceleration
+        if discriminant < 0:
+            raise ValueError(f"A trip time of {trip_time} is too short at this acceleration.")
+        velocity = 0.5 * self.acceleration * (duration - math.sqrt(discriminant))
+        self._check_velocity(velocity)
+        return self.payload_mass * math.expm1(2 * velocity / self.exhaust_velocity) * kg
+
+    def min_fuel_for_velocity(self, cruise_velocity):
+        """Return the least fuel mass that reaches cruise_velocity and brakes to rest."""
+        velocity = magnitude(cruise_velocity, m / s)
+        return self.payload_mass * math.expm1(2 * velocity / self.exhaust_velocity) * kg
@@ -0,0 +1,134 @@
+"""Multi-stage rockets: staged delta-v and the optimal split of mass between stages.
+
+Stage k has fuel f_k, dry mass d_k (engine and empty tanks) and exhaust
+velocity ve_k. Stages fire in order, the first one first, and each is
+jettisoned once empty, so stage k burns with everything from k up still on
+board:
+
+    m_k = payload + sum of (f_j + d_j) for j >= k
+    delta_v = sum of ve_k * log(m_k / (m_k - f_k))
+
+For a target delta_v, the stages that minimize the launch mass follow from
+a Lagrange multiplier. With structural ratios e_k = d_k / (d_k + f_k), the
+optimal mass ratio m_k / (m_k - f_k) of stage k is
+
+    n_k = (1 - u / ve_k) / e_k        (or 1, an idle stage, if that is less)
+
+where u, a speed, is one over the multiplier and the root of
+sum of ve_k * log(n_k) = delta_v. When every stage has the same ve and e
+this is closed form, n_k = exp(delta_v / (K * ve)); otherwise the root is
+found by safeguarded Newton iterations, about ten, run on all the designs of
+a batch at once.
+"""
+
+from collections import namedtuple
+
+from scimath.units.length import meters as m
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+import numpy as np
+
+from starship import Engine, magnitude
+
+StagingSolution = namedtuple('StagingSolution', ['launch_mass', 'fuel_mass', 'dry_mass', 'mass_ratio'])
+
+
+def staged_delta_v(payload_mass, fuel_mass, dry_mass, exhaust_velocity):
+    """Delta-v of multi-stage rockets, SI floats or arrays.
+
+    Args:
+        payload_mass: float or array (...), kg
+        fuel_mass: array (..., K), kg, first stage first
+        dry_mass: array (..., K), kg
+        exhaust_velocity: array (..., K), m/s
+
+    Returns:
+        delta_v: array (...), m/s
+    """
+    fuel, dry, ve = np.broadcast_arrays(np.asarray(fuel_mass, dtype=float), np.asarray(dry_mass, dtype=float),
+                                        np.asarray(exhaust_velocity, dtype=float))
+    # Mass at ignition of each stage: the payload and this and every later stage
+    above = np.cumsum((fuel + dry)[..., ::-1], axis=-1)[..., ::-1]
+    ignition = np.asarray(payload_mass, dtype=float)[..., np.newaxis] + above
+    return (ve * np.log(ignition / (ignition - fuel))).sum(axis=-1)
+
+
+def _mass_ratios(u, ve, structural_ratio):
+    """Optimal stage mass ratios for the parameter u, with the slope of sum ve log n."""
+    active = u[..., np.newaxis] < ve * (1 - structural_ratio)
+    fraction = np.where(active, 1 - u[..., np.newaxis] / ve, structural_ratio)
+    slope = np.where(active, -1 / fraction, 0.0).sum(axis=-1)
+    return fraction / structural_ratio, slope
+
+
+def optimal_staging(payload_mass, delta_v, exhaust_velocity, structural_ratio, tolerance=1e-12, max_iterations=100):
+    """Stage masses giving delta_v with the least launch mass, for a batch of designs.
+
+    Args:
+        payload_mass: unit (mass), scalar or array (...)
+        delta_v: unit (speed), scalar or array (...)
+        exhaust_velocity: unit (speed) array (..., K), first stage first
+        structural_ratio: float or array (..., K), dry mass / (dry + fuel mass) of each stage
+        tolerance: float, relative error in delta_v to stop at
+
+    Returns:
+        StagingSolution of launch_mass (...) and fuel_mass, dry_mass (..., K)
+        as unit arrays and the mass_ratio (..., K) of each stage. Designs
+        that cannot reach delta_v, even with stages of pure fuel but for
+        their dry mass, get NaN.
+    """
+    payload = np.asarray(magnitude(payload_mass, kg), dtype=float)
+    target = np.asarray(magnitude(delta_v, m / s), dtype=float)
+    ve = np.asarray(magnitude(exhaust_velocity, m / s), dtype=float)
+    structural_ratio = np.asarray(structural_ratio, dtype=float)
+    ve, structural_ratio = np.broadcast_arrays(ve, structural_ratio)
+    shape = np.broadcast_shapes(payload.shape, target.shape, ve.shape[:-1])
+    payload, target = np.broadcast_to(payload, shape), np.broadcast_to(target, shape)
+    ve, structural_ratio = (np.broadcast_to(a, shape + ve.shape[-1:]) for a in (ve, structural_ratio))
+
+    # sum ve log n falls from its largest value, every n_k = 1 / e_k, at u = 0
+    # to 0, every stage idle, at u = max(ve_k (1 - e_k))
+    ceiling = (ve * np.log(1 / structural_ratio)).sum(axis=-1)
+    feasible = target < ceiling
+    low = np.zeros(shape)
+    high = (ve * (1 - structural_ratio)).max(axis=-1)
+    u = low.copy()
+    for _ in range(max_iterations):
+        ratio, slope = _mass_ratios(u, ve, structural_ratio)
+        error = (ve * np.log(ratio)).sum(axis=-1) - target
+        done = ~feasible | (np.abs(error) <= tolerance * target)
+        if done.all():
+            break
+        low = np.where(error > 0, u, low)
+        high = np.where(error <= 0, u, high)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = u - error / slope
+        step = np.where((newton > low) & (newton < high), newton, 0.5 * (low + high))
+        u = np.where(done, u, step)
+
+    ratio, _ = _mass_ratios(u, ve, structural_ratio)
+    # Build the rocket from the payload down: stage k multiplies the mass above it by
+    # n_k (1 - e_k) / (1 - e_k n_k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = ratio * (1 - structural_ratio) / (1 - structural_ratio * ratio)
+        above = payload[..., np.newaxis] * np.cumprod(growth[..., ::-1], axis=-1)[..., ::-1]
+        stage_mass = above - np.append(above[..., 1:], payload[..., np.newaxis], axis=-1)
+    fuel = (1 - structural_ratio) * stage_mass
+    dry = structural_ratio * stage_mass
+    launch = np.where(feasible, above[..., 0], np.nan)
+    fuel, dry, ratio = (np.where(feasible[..., np.newaxis], a, np.nan) for a in (fuel, dry, ratio))
+    return StagingSolution(launch_mass=kg * launch, fuel_mass=kg * fuel, dry_mass=kg * dry, mass_ratio=ratio)
+
+
+def stage_engines(solution, exhaust_velocity, names=None):
+    """Engines dict for a Starship from one design of a StagingSolution.
+
+    Stages are named 'stage 1', 'stage 2', ... unless names are given, and
+    are in firing order.
+    """
+    fuel = np.atleast_1d(solution.fuel_mass / kg)
+    dry = np.atleast_1d(solution.dry_mass / kg)
+    ve = np.broadcast_to(magnitude(exhaust_velocity, m / s), fuel.shape)
+    names = names or [f'stage {k + 1}' for k in range(len(fuel))]
+    return {name: Engine(f * kg, exhaust_velocity=v * m / s, dry_mass=d * kg)
+            for name, f, d, v in zip(names, fuel, dry, ve)}
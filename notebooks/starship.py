@@ -0,0 +1,756 @@
+"""Starships, engines and the physical constants used by the Interstellar Planner notebook."""
+
+from scimath.units.length import meters as m
+from scimath.units.length import kilometers as km
+from scimath.units.length import light_year as ly
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+from scimath.units.time import years as yr
+from scimath.units.unit import unit
+import math
+import weakref
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from history import MessageTemplate, MissionHistory
+import relativity
+from rocket_table import fuel_for_delta_v, rocket_table
+import thrust
+
+G = 6.674e-11 * m**3 / kg / s**2
+c = 299792458 * m / s
+solar_mass = 1.98847e30 * kg
+g = 9.81 * m / (s**2)
+
+# SI magnitudes of the units above, for the float fast path in Starship
+_c = 299792458.0
+_g = 9.81
+_yr = yr / s
+_ly = ly / m
+
+# Log message templates; their SI float arguments are converted and formatted only when read
+_ACCELERATE_MESSAGE = MessageTemplate("year {0:0.1f} - Acceleration: {1:0.1f} g for {2:0.2e} years. "
+                                      " New velocity is {3:0.2e} c. "
+                                      " {4:0.2e} kg of fuel remaining.",
+                                      (_yr, _g, _yr, _c, None))
+_CRUISE_MESSAGE = MessageTemplate("year {0:0.1f} - Cruise: {1:0.2e} years to complete. "
+                                  "Distance={2:0.2e} lightyears",
+                                  (_yr, _yr, _ly))
+_WAIT_MESSAGE = MessageTemplate("year {0:0.1f} - Waited: {1:0.2e} years. "
+                                "Distance={2:0.2e} lightyears",
+                                (_yr, _yr, _ly))
+_JETTISON_MESSAGE = MessageTemplate("year {0:0.1f} - Jettisoned {1}: {2:0.2e} kg dry mass "
+                                    "and {3:0.2e} kg of fuel.",
+                                    (_yr, None, None, None))
+_RELATIVISTIC_ACCELERATE_MESSAGE = MessageTemplate("year {0:0.1f} - Acceleration: {1:0.1f} g for {2:0.2e} years "
+                                                   "({5:0.2e} years on board). "
+                                                   " New velocity is {3:0.6g} c. "
+                                                   " {4:0.2e} kg of fuel remaining.",
+                                                   (_yr, _g, _yr, _c, None, _yr))
+_RELATIVISTIC_CRUISE_MESSAGE = MessageTemplate("year {0:0.1f} - Cruise: {1:0.2e} years to complete "
+                                               "({3:0.2e} years on board). "
+                                               "Distance={2:0.2e} lightyears",
+                                               (_yr, _yr, _ly, _yr))
+_RELATIVISTIC_WAIT_MESSAGE = MessageTemplate("year {0:0.1f} - Waited: {1:0.2e} years "
+                                             "({3:0.2e} years on board). "
+                                             "Distance={2:0.2e} lightyears",
+                                             (_yr, _yr, _ly, _yr))
+
+
+def v_escape_solar(departure_distance):
+    v = (2 * G * solar_mass / departure_distance)**0.5
+    return v
+
+
+def magnitude(quantity, units):
+    """Return quantity as a plain number (or array) expressed in units.
+
+    Raises ValueError if quantity is not dimensionally compatible with units.
+    """
+    value = quantity / units
+    if isinstance(value, unit):
+        raise ValueError(f"Expected a quantity in units compatible with {units}, got {quantity}.")
+    return value
+
+
+class Engine:
+    """An engine to accelerate a Starship.
+
+    This assumes constant accelerations and nonrelativistic speeds.
+    Fuel mass and exhaust velocity are stored as SI floats; the public
+    attributes convert to and from unit quantities. Every change to the fuel
+    or dry mass is reported to the Starships carrying the engine, which keep
+    running totals. They are held weakly, so a ship that is no longer used
+    does not keep its engines.
+
+    dry_mass is the mass of the engine and its empty tanks. It counts toward
+    the ship's mass until the engine is dropped with Starship.jettison, so an
+    engine is also a rocket stage.
+
+    With use_table=True the float fast path (Starship(check_units=False))
+    evaluates the rocket equation from a shared interpolated RocketTable and
+    memoizes set_target_delta_v; see rocket_table.py for the error bound.
+    """
+    def __init__(self,
+                 fuel_mass,
+                 exhaust_velocity = 500 * km / s,
+                 use_table = False,
+                 dry_mass = 0 * kg,
+                 ):
+        self.use_table = use_table
+        # Weak references to the Starships carrying this engine
+        self._starships = ()
+        self._fuel_mass = 0.0
+        self._dry_mass = 0.0
+        self.fuel_mass = fuel_mass
+        self.dry_mass = dry_mass
+        self.exhaust_velocity = exhaust_velocity
+
+    @property
+    def dry_mass(self):
+        return self._dry_mass * kg
+
+    @dry_mass.setter
+    def dry_mass(self, value):
+        dry_mass = magnitude(value, kg)
+        for reference in self._starships:
+            starship = reference()
+            if starship is not None:
+                starship._dry_total += dry_mass - self._dry_mass
+        self._dry_mass = dry_mass
+
+    def _attach(self, starship):
+        self._detach(starship)
+        self._starships += (weakref.ref(starship),)
+
+    def _detach(self, starship):
+        self._starships = tuple(r for r in self._starships if r() not in (None, starship))
+
+    @property
+    def fuel_mass(self):
+        return self._fuel_mass * kg
+
+    @fuel_mass.setter
+    def fuel_mass(self, value):
+        self._set_fuel_mass(magnitude(value, kg))
+
+    def _set_fuel_mass(self, fuel_mass):
+        for reference in self._starships:
+            starship = reference()
+            if starship is not None:
+                starship._fuel_total += fuel_mass - self._fuel_mass
+        self._fuel_mass = fuel_mass
+
+    @property
+    def exhaust_velocity(self):
+        return self._exhaust_velocity * m / s
+
+    @exhaust_velocity.setter
+    def exhaust_velocity(self, value):
+        self._exhaust_velocity = magnitude(value, m / s)
+
+    def burn_fuel(self, burnt_fuel_mass, starship_mass):
+        """Return the change in velocity after burning burnt_fuel_mass for a ship with mass starship_mass."""
+        if burnt_fuel_mass / kg > self.fuel_mass / kg:
+            raise ValueError(f"Not enough fuel for this maneuver. Requested {burnt_fuel_mass} of {self.fuel_mass}.")
+        delta_v = self.exhaust_velocity * np.log(starship_mass / (starship_mass - burnt_fuel_mass))
+        self.fuel_mass -= burnt_fuel_mass
+        return delta_v
+
+    def set_target_delta_v(self, delta_v, starship_mass):
+        final_mass = starship_mass * np.exp(-1 * np.abs(delta_v) / self.exhaust_velocity)
+        delta_fuel_mass = starship_mass - final_mass
+        _ = self.burn_fuel(delta_fuel_mass, starship_mass)
+        if self.fuel_mass / kg < 0:
+            raise ValueError(f"Note enough fuel for this maneuver. Requested {delta_fuel_mass} of {self.fuel_mass + delta_fuel_mass}.")
+
+    def _burn_fuel(self, burnt_fuel_mass, starship_mass):
+        """burn_fuel on plain SI floats: masses in kg, returns delta_v in m/s."""
+        if burnt_fuel_mass > self._fuel_mass:
+            raise ValueError(f"Not enough fuel for this maneuver. Requested {burnt_fuel_mass * kg} of {self.fuel_mass}.")
+        mass_ratio = starship_mass / (starship_mass - burnt_fuel_mass)
+        if self.use_table:
+            delta_v = rocket_table().delta_v(mass_ratio, self._exhaust_velocity)
+        else:
+            delta_v = self._exhaust_velocity * math.log(mass_ratio)
+        self._set_fuel_mass(self._fuel_mass - burnt_fuel_mass)
+        return delta_v
+
+    def _set_target_delta_v(self, delta_v, starship_mass):
+        """set_target_delta_v on plain SI floats: delta_v in m/s, mass in kg."""
+        if self.use_table:
+            delta_fuel_mass = fuel_for_delta_v(self._exhaust_velocity, starship_mass, abs(delta_v))
+        else:
+            final_mass = starship_mass * math.exp(-1 * abs(delta_v) / self._exhaust_velocity)
+            delta_fuel_mass = starship_mass - final_mass
+        _ = self._burn_fuel(delta_fuel_mass, starship_mass)
+
+    def _burn_rapidity(self, burnt_fuel_mass, starship_mass):
+        """Relativistic rocket equation on SI floats: returns the change in rapidity."""
+        if burnt_fuel_mass > self._fuel_mass:
+            raise ValueError(f"Not enough fuel for this maneuver. Requested {burnt_fuel_mass * kg} of {self.fuel_mass}.")
+        delta_rapidity = self._exhaust_velocity / _c * math.log(starship_mass / (starship_mass - burnt_fuel_mass))
+        self._set_fuel_mass(self._fuel_mass - burnt_fuel_mass)
+        return delta_rapidity
+
+    def _set_target_rapidity(self, delta_rapidity, starship_mass):
+        """Burn the fuel for a change in rapidity of either sign, SI floats."""
+        delta_fuel_mass = starship_mass * -math.expm1(-_c * abs(delta_rapidity) / self._exhaust_velocity)
+        _ = self._burn_rapidity(delta_fuel_mass, starship_mass)
+
+
+class _Engines(dict):
+    """A Starship's engines; changes go through the ship, which keeps its totals current."""
+    def __init__(self, starship):
+        super().__init__()
+        self._starship = starship
+
+
+def _through_starship(name):
+    method = getattr(dict, name)
+
+    def change(self, *args, **kwargs):
+        engines = dict(self)
+        result = method(engines, *args, **kwargs)
+        self._starship._set_engines(self, engines)
+        return self if result is engines else result
+    change.__name__ = name
+    return change
+
+
+for _name in ('__setitem__', '__delitem__', '__ior__', 'clear', 'pop', 'popitem', 'setdefault', 'update'):
+    setattr(_Engines, _name, _through_starship(_name))
+
+
+class Starship:
+    """A Starship that uses engines to accelerate.
+
+    By default every maneuver is evaluated with unit quantities. With
+    check_units=False, units are checked and converted once when a value enters
+    the ship (constructor and maneuver arguments), the maneuvers run on plain SI
+    floats, and units are added back on returned values.
+
+    Log messages are stored as templates and formatted only when read. With
+    record_messages=False they are not recorded at all.
+
+    The total fuel mass is kept up to date by the engines as they burn, so
+    fuel_mass() and total_mass() are O(1). Assign a new dict to engines, or
+    change the one it returns, to add or remove engines, or jettison one to
+    drop it as a spent stage; engines that are dropped no longer count
+    toward the ship's totals.
+
+    With a gravity field (see gravity.py) every leg is propagated through
+    the pull of its masses on SI floats, whatever check_units says. Burns
+    still change the velocity by what the engine delivers, and gravity adds
+    to that, except that a burn to a target velocity lasts as long as it
+    takes to end at that velocity with gravity included. A ship at rest is
+    taken to be parked, in orbit, and waits without falling.
+
+    With relativistic=True legs also run on SI floats, using the relativistic
+    rocket equation and constant proper acceleration (see relativity.py), so
+    there is no speed limit below c. The ship's rapidity is kept alongside
+    its velocity, and proper_time is the time elapsed on board.
+
+    With constant_thrust=True burns run at constant thrust, the acceleration
+    argument of accelerate being the acceleration at ignition, rather than
+    at constant acceleration. The ship then speeds up faster as it gets
+    lighter, in closed form (see thrust.py), and each burn records
+    burn_samples time-resolved entries in the history before its usual
+    one, so memory grows by a fixed amount per burn.
+    """
+    def __init__(self,
+                 payload_mass,
+                 engines: dict,
+                 initial_velocity = 0 * m / s,
+                 initial_position = 0 * km,
+                 initial_time = 0 * s,
+                 destination_distance = 4.244 * ly,
+                 check_units = True,
+                 record_messages = True,
+                 gravity = None,
+                 relativistic = False,
+                 constant_thrust = False,
+                 burn_samples = 16,
+                 ):
+        if gravity is not None and relativistic:
+            raise ValueError("Relativistic legs through a gravity field are not supported.")
+        if constant_thrust and (gravity is not None or relativistic):
+            raise ValueError("Constant thrust burns are only supported without gravity and relativity.")
+        self.payload_mass = payload_mass
+        self.engines = engines
+        self.velocity = initial_velocity
+        self.position = initial_position
+        self.time = initial_time
+        self._start_time = self._time
+        self.destination_distance = destination_distance
+        self.check_units = check_units
+        self.record_messages = record_messages
+        self.gravity = gravity
+        self.relativistic = relativistic
+        self.constant_thrust = constant_thrust
+        self.burn_samples = burn_samples
+        self._proper_time = 0.0
+        # (velocity, rapidity) as of the last relativistic leg
+        self._rapidity = (0.0, 0.0)
+        self.history = MissionHistory()
+        self.log_entry()
+
+    @property
+    def payload_mass(self):
+        return self._payload_mass * kg
+
+    @payload_mass.setter
+    def payload_mass(self, value):
+        self._payload_mass = magnitude(value, kg)
+
+    @property
+    def engines(self):
+        return self._engines
+
+    @engines.setter
+    def engines(self, engines):
+        self._set_engines(_Engines(self), engines)
+
+    def _set_engines(self, container, engines):
+        """Fill container with engines, make it the ship's engines and recompute the totals."""
+        if len({id(engine) for engine in engines.values()}) < len(engines):
+            raise ValueError("The same Engine appears more than once in engines.")
+        # Engines left behind stop reporting to this ship
+        for engine in getattr(self, '_engines', {}).values():
+            engine._detach(self)
+        for engine in engines.values():
+            engine._attach(self)
+        dict.clear(container)
+        dict.update(container, engines)
+        self._engines = container
+        self._fuel_total = sum([e._fuel_mass for e in engines.values()])
+        self._dry_total = sum([e._dry_mass for e in engines.values()])
+
+    @property
+    def velocity(self):
+        return self._velocity * m / s
+
+    @velocity.setter
+    def velocity(self, value):
+        self._velocity = magnitude(value, m / s)
+
+    @property
+    def position(self):
+        return self._position * m
+
+    @position.setter
+    def position(self, value):
+        self._position = magnitude(value, m)
+
+    @property
+    def time(self):
+        return self._time * s
+
+    @time.setter
+    def time(self, value):
+        self._time = magnitude(value, s)
+
+    @property
+    def proper_time(self):
+        """Time elapsed on board since initial_time; the coordinate time elapsed unless relativistic."""
+        if not self.relativistic:
+            return (self._time - self._start_time) * s
+        return self._proper_time * s
+
+    @property
+    def destination_distance(self):
+        return self._destination_distance * m
+
+    @destination_distance.setter
+    def destination_distance(self, value):
+        self._destination_distance = magnitude(value, m)
+
+    @property
+    def log_messages(self):
+        return self.history.messages()
+
+    def log_entry(self, message: str = '', *args):
+        """Record the current state. message is formatted with args only when it is read."""
+        return self._log_entry(message, *args)
+
+    def total_mass(self):
+        if not self.check_units:
+            return self._total_mass() * kg
+        return self.payload_mass + (self._fuel_total + self._dry_total) * kg
+
+    def fuel_mass(self):
+        return self._fuel_total * kg
+
+    def dry_mass(self):
+        """Mass of the engines and their empty tanks."""
+        return self._dry_total * kg
+
+    def jettison(self, engine_name):
+        """Drop an engine, with its tanks and any fuel left in them, e.g. a spent stage."""
+        engines = dict(self.engines)
+        engine = engines.pop(engine_name)
+        self.engines = engines
+        self._log_entry(_JETTISON_MESSAGE, self._time, engine_name, engine._dry_mass, engine._fuel_mass)
+
+    def accelerate(self,
+                   engine_name = 'main',
+                   target_velocity = 0 * km / s,
+                   fuel_mass = None,
+                   decelerate = False,
+                   acceleration = g):
+        """Accelerate the ship by burning a specified quantity of fuel.
+
+        If no fuel mass is specified, a target_velocity should be specified instead.
+
+        Args:
+            target_velocity: unit (speed)
+                Target velocity to accelerate to.
+            fuel_mass: unit (mass)
+                Amount of fuel mass to burn
+            decelerate: bool
+                If True, acceleration is toward the origin. If False, acceleration is toward the destination
+
+        Returns:
+            unit (speed)
+                New velocity of the starship
+        """
+        if not self.check_units or self.gravity is not None or self.relativistic or self.constant_thrust:
+            self._accelerate(engine_name,
+                             magnitude(target_velocity, m / s),
+                             None if fuel_mass is None else magnitude(fuel_mass, kg),
+                             decelerate,
+                             magnitude(acceleration, m / s**2))
+            return self.velocity
+
+        if fuel_mass is not None:
+            delta_v = self.engines[engine_name].burn_fuel(fuel_mass, self.total_mass())
+            delta_t = np.abs(delta_v) / acceleration
+            if decelerate:
+                delta_pos = self.velocity * delta_t - 0.5 * acceleration * delta_t ** 2
+                self.velocity -= delta_v
+            else:
+                delta_pos = self.velocity * delta_t + 0.5 * acceleration * delta_t ** 2
+                self.velocity += delta_v
+            self.time += delta_t
+            self.position += delta_pos
+
+
+        else:
+            self.engines[engine_name].set_target_delta_v(self.velocity - target_velocity, self.total_mass())
+            delta_v = target_velocity - self.velocity
+            delta_t = np.abs(delta_v) / acceleration
+            if decelerate:
+                delta_pos = self.velocity * delta_t - 0.5 * acceleration * delta_t ** 2
+            else:
+                delta_pos = self.velocity * delta_t + 0.5 * acceleration * delta_t ** 2
+            self.time += delta_t
+            self.velocity = target_velocity
+            self.position += delta_pos
+
+        if abs(self.velocity / c) > 0.5:
+            raise NotImplementedError("This ship is travelling at reletivistic speeds. This is not currently supported.")
+
+        if self.record_messages:
+            delta_t = magnitude(delta_t, s)
+            self._log_entry(_ACCELERATE_MESSAGE,
+                            self._time - delta_t,
+                            magnitude(acceleration, m / s**2),
+                            delta_t,
+                            self._velocity,
+                            self._fuel_mass())
+        else:
+            self._log_entry()
+
+        return self.velocity
+
+    def cruise(self, distance):
+        if not self.check_units or self.gravity is not None or self.relativistic:
+            return self._cruise(magnitude(distance, m))
+        if self.velocity == 0:
+            raise ValueError(f"The starship is not moving. Can't cruise.")
+        delta_pos = distance * np.sign(self.velocity / (m / s))
+        delta_t = np.abs(distance / self.velocity)
+        self.position += delta_pos
+        self.time += delta_t
+        if self.record_messages:
+            delta_t = magnitude(delta_t, s)
+            self._log_entry(_CRUISE_MESSAGE, self._time - delta_t, delta_t, magnitude(distance, m))
+        else:
+            self._log_entry()
+
+    def wait(self, time):
+        if not self.check_units or self.gravity is not None or self.relativistic:
+            return self._wait(magnitude(time, s))
+        self.time += time
+        distance = self.velocity * time
+        self.position += distance
+        if self.record_messages:
+            time = magnitude(time, s)
+            self._log_entry(_WAIT_MESSAGE, self._time - time, time, magnitude(distance, m))
+        else:
+            self._log_entry()
+
+    # Plain SI float implementations used when check_units is False.
+    # Times are in s, positions in m, velocities in m/s and masses in kg.
+
+    def _log_entry(self, message: str = '', *args):
+        if not self.record_messages:
+            message, args = '', ()
+        self.history.append(self._time, self._position, self._velocity, self._fuel_mass(), message, *args)
+
+    def _total_mass(self):
+        return self._payload_mass + self._fuel_mass() + self._dry_total
+
+    def _fuel_mass(self):
+        return self._fuel_total
+
+    def _accelerate(self, engine_name, target_velocity, fuel_mass, decelerate, acceleration):
+        if self.relativistic:
+            return self._accelerate_relativistic(engine_name, target_velocity, fuel_mass, decelerate, acceleration)
+        if self.constant_thrust:
+            return self._accelerate_constant_thrust(engine_name, target_velocity, fuel_mass, decelerate,
+                                                    acceleration)
+        if self.gravity is not None:
+            return self._accelerate_gravity(engine_name, target_velocity, fuel_mass, decelerate, acceleration)
+        if fuel_mass is not None:
+            delta_v = self.engines[engine_name]._burn_fuel(fuel_mass, self._total_mass())
+            delta_t = np.abs(delta_v) / acceleration
+            if decelerate:
+                delta_pos = self._velocity * delta_t - 0.5 * acceleration * delta_t ** 2
+                self._velocity -= delta_v
+            else:
+                delta_pos = self._velocity * delta_t + 0.5 * acceleration * delta_t ** 2
+                self._velocity += delta_v
+        else:
+            self.engines[engine_name]._set_target_delta_v(self._velocity - target_velocity, self._total_mass())
+            delta_v = target_velocity - self._velocity
+            delta_t = np.abs(delta_v) / acceleration
+            if decelerate:
+                delta_pos = self._velocity * delta_t - 0.5 * acceleration * delta_t ** 2
+            else:
+                delta_pos = self._velocity * delta_t + 0.5 * acceleration * delta_t ** 2
+            self._velocity = target_velocity
+        self._time += delta_t
+        self._position += delta_pos
+
+        if abs(self._velocity / _c) > 0.5:
+            raise NotImplementedError("This ship is travelling at reletivistic speeds. This is not currently supported.")
+
+        if self.record_messages:
+            self._log_entry(_ACCELERATE_MESSAGE, self._time - delta_t, acceleration, delta_t, self._velocity,
+                            self._fuel_mass())
+        else:
+            self._log_entry()
+
+    def _accelerate_gravity(self, engine_name, target_velocity, fuel_mass, decelerate, acceleration):
+        engine = self.engines[engine_name]
+        # The ship's state only changes once the burn has been flown and paid for
+        if fuel_mass is not None:
+            initial_fuel = engine._fuel_mass
+            delta_t = abs(engine._burn_fuel(fuel_mass, self._total_mass())) / acceleration
+            thrust = -acceleration if decelerate else acceleration
+            position, velocity = self._position, self._velocity
+            if delta_t > 0:
+                try:
+                    position, velocity = self.gravity.burn(position, velocity, thrust, delta_t)
+                except ValueError:
+                    engine._set_fuel_mass(initial_fuel)
+                    raise
+        else:
+            # Gravity adds to what the engine delivers, so burn for as long as it takes
+            # to end at the target velocity, and pay for the engine's share
+            thrust = math.copysign(acceleration, target_velocity - self._velocity)
+            delta_t, position = self._burn_time(target_velocity, thrust)
+            engine._set_target_delta_v(acceleration * delta_t, self._total_mass())
+            velocity = target_velocity
+        self._position, self._velocity = position, velocity
+        self._time += delta_t
+
+        if abs(self._velocity / _c) > 0.5:
+            raise NotImplementedError("This ship is travelling at reletivistic speeds. This is not currently supported.")
+
+        if self.record_messages:
+            self._log_entry(_ACCELERATE_MESSAGE, self._time - delta_t, acceleration, delta_t, self._velocity,
+                            self._fuel_mass())
+        else:
+            self._log_entry()
+
+    def _burn_time(self, target_velocity, thrust, max_iterations=50):
+        """Duration of a burn at thrust through the gravity field that ends at target_velocity.
+
+        Newton iterations on the duration, each propagating the burn from the
+        current state. Returns the duration and the position at its end.
+        """
+        x, v = self._position, self._velocity
+        tolerance = 1e-10 * abs(target_velocity - v) + 1e-9
+        duration = abs(target_velocity - v) / abs(thrust)
+        end_x, end_v = x, v
+        for _ in range(max_iterations):
+            if duration > 0:
+                end_x, end_v = self.gravity.burn(x, v, thrust, duration)
+            error = end_v - target_velocity
+            if abs(error) <= tolerance:
+                return duration, end_x
+            rate = thrust + self.gravity.acceleration(end_x)
+            if rate * thrust <= 0:
+                raise ValueError(f"Gravity overpowers an engine accelerating at {abs(thrust) * m / s**2}; "
+                                 f"can't reach {target_velocity * m / s}.")
+            duration = max(duration - error / rate, 0.0)
+        raise ValueError(f"A burn to {target_velocity * m / s} through the gravity field did not converge.")
+
+    def _accelerate_constant_thrust(self, engine_name, target_velocity, fuel_mass, decelerate, acceleration):
+        engine = self.engines[engine_name]
+        initial_mass = self._total_mass()
+        initial_fuel = engine._fuel_mass
+        if fuel_mass is not None:
+            engine._burn_fuel(fuel_mass, initial_mass)
+            direction = -1.0 if decelerate else 1.0
+        else:
+            engine._set_target_delta_v(self._velocity - target_velocity, initial_mass)
+            direction = 1.0 if target_velocity >= self._velocity else -1.0
+        burn = thrust.constant_thrust_burn(initial_mass, initial_fuel - engine._fuel_mass,
+                                           engine._exhaust_velocity, acceleration, self.burn_samples)
+        time = self._time + burn.time
+        position = self._position + self._velocity * burn.time + direction * burn.distance
+        velocity = self._velocity + direction * burn.velocity
+        fuel = self._fuel_mass() + (initial_fuel - engine._fuel_mass) - burn.fuel_burnt
+        self.history.extend(time[:-1], position[:-1], velocity[:-1], fuel[:-1])
+        delta_t = burn.time[-1]
+        self._time, self._position, self._velocity = time[-1], position[-1], velocity[-1]
+
+        if abs(self._velocity / _c) > 0.5:
+            raise NotImplementedError("This ship is travelling at reletivistic speeds. This is not currently supported.")
+
+        if self.record_messages:
+            self._log_entry(_ACCELERATE_MESSAGE, self._time - delta_t, acceleration, delta_t, self._velocity,
+                            self._fuel_mass())
+        else:
+            self._log_entry()
+
+    def _current_rapidity(self):
+        velocity, rapidity = self._rapidity
+        if velocity != self._velocity:
+            # The velocity was set from outside
+            rapidity = math.atanh(self._velocity / _c)
+        return rapidity
+
+    def _set_rapidity(self, rapidity):
+        self._velocity = _c * math.tanh(rapidity)
+        self._rapidity = (self._velocity, rapidity)
+
+    def _accelerate_relativistic(self, engine_name, target_velocity, fuel_mass, decelerate, acceleration):
+        initial_rapidity = self._current_rapidity()
+        engine = self.engines[engine_name]
+        if fuel_mass is not None:
+            delta_rapidity = engine._burn_rapidity(fuel_mass, self._total_mass())
+            if decelerate:
+                delta_rapidity = -delta_rapidity
+        else:
+            if abs(target_velocity) >= _c:
+                raise ValueError(f"Can't reach a target velocity of {target_velocity * m / s}, at or above c.")
+            delta_rapidity = math.atanh(target_velocity / _c) - initial_rapidity
+            engine._set_target_rapidity(delta_rapidity, self._total_mass())
+        burn = relativity.constant_proper_acceleration(initial_rapidity, delta_rapidity, acceleration)
+        self._time += burn.coordinate_time
+        self._proper_time += burn.proper_time
+        self._position += burn.distance
+        self._set_rapidity(burn.rapidity)
+
+        if self.record_messages:
+            self._log_entry(_RELATIVISTIC_ACCELERATE_MESSAGE,
+                            self._time - burn.coordinate_time,
+                            acceleration,
+                            burn.coordinate_time,
+                            self._velocity,
+                            self._fuel_mass(),
+                            burn.proper_time)
+        else:
+            self._log_entry()
+
+    def _cruise(self, distance):
+        if self._velocity == 0:
+            raise ValueError(f"The starship is not moving. Can't cruise.")
+        if self.relativistic:
+            delta_t, delta_tau = relativity.coast(self._current_rapidity(), distance)
+            self._position += distance * np.sign(self._velocity)
+            self._time += delta_t
+            self._proper_time += delta_tau
+            if self.record_messages:
+                self._log_entry(_RELATIVISTIC_CRUISE_MESSAGE, self._time - delta_t, delta_t, distance, delta_tau)
+            else:
+                self._log_entry()
+            return
+        if self.gravity is not None:
+            self._position, self._velocity, delta_t = self.gravity.coast(self._position, self._velocity,
+                                                                         distance=distance)
+        else:
+            delta_t = np.abs(distance / self._velocity)
+            self._position += distance * np.sign(self._velocity)
+        self._time += delta_t
+        if self.record_messages:
+            self._log_entry(_CRUISE_MESSAGE, self._time - delta_t, delta_t, distance)
+        else:
+            self._log_entry()
+
+    def _wait(self, time):
+        if self.relativistic:
+            delta_tau = time / relativity.lorentz_factor(self._current_rapidity())
+            self._time += time
+            self._proper_time += delta_tau
+            distance = self._velocity * time
+            self._position += distance
+            if self.record_messages:
+                self._log_entry(_RELATIVISTIC_WAIT_MESSAGE, self._time - time, time, distance, delta_tau)
+            else:
+                self._log_entry()
+            return
+        self._time += time
+        if self.gravity is not None and self._velocity != 0:
+            start = self._position
+            self._position, self._velocity, _ = self.gravity.coast(start, self._velocity, duration=time)
+            distance = self._position - start
+        else:
+            distance = self._velocity * time
+            self._position += distance
+        if self.record_messages:
+            self._log_entry(_WAIT_MESSAGE, self._time - time, time, distance)
+        else:
+            self._log_entry()
+
+    def print_history(self):
+        for log, message in zip(self.history, self.log_messages):
+            print()
+            print(message)
+            print(log)
+
+    def parse_logs(self):
+        """Return arrays of positions (ly), velocities (c), fuel masses (kg) and times (yr)."""
+        positions = self.history.position / _ly
+        velocities = self.history.velocity / _c
+        fuels = self.history.fuel_mass
+        times = self.history.time / _yr
+        return positions, velocities, fuels, times
+
+    def plot_history(self):
+        positions, velocities, fuels, times = self.parse_logs()
+        fig = plt.figure(figsize=(12, 12))
+        plt.subplot(311)
+        plt.plot(times, velocities)
+        plt.xlabel('Time (years)')
+        plt.ylabel('Velocity (c)')
+        plt.subplot(312)
+        plt.plot(times, fuels)
+        plt.xlabel('Time (years)')
+        plt.ylabel('Fuel Mass (kg)')
+        plt.subplot(313)
+        plt.plot(times, positions)
+        plt.xlabel('Time (years)')
+        plt.ylabel('Position (light years)')
+        plt.hlines(self.destination_distance / ly,
+                   times.min(),
+                   times.max(),
+                   label='Destination',
+                   linestyles='dashed')
+        plt.legend()
+        return fig
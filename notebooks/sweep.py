@@ -0,0 +1,115 @@
+"""Run parameter sweeps of the standard mission across a process pool.
+
+Each configuration is a (payload_mass, fuel_mass, exhaust_velocity,
+burn_fraction, destination_distance) tuple. Units are stripped once in the
+parent process, the configurations are shipped to the workers as chunks of a
+plain float array, and every worker flies the mission with the ordinary
+Starship and Engine classes. Results come back as a NumPy structured array in
+the same order as the configurations, whatever the number of workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from scimath.units.length import meters as m
+from scimath.units.mass import kilograms as kg
+from scimath.units.time import seconds as s
+import numpy as np
+
+from starship import Engine, Starship, g, magnitude
+
+result_dtype = np.dtype([('payload_mass', float),          # kg
+                         ('fuel_mass', float),             # kg
+                         ('exhaust_velocity', float),      # m/s
+                         ('burn_fraction', float),
+                         ('destination_distance', float),  # m
+                         ('arrival_time', float),          # s
+                         ('cruise_velocity', float),       # m/s
+                         ('fuel_remaining', float),        # kg
+                         ('feasible', bool)])
+
+
+def fly_standard_mission(payload_mass, fuel_mass, exhaust_velocity, burn_fraction, destination_distance):
+    """Fly the standard mission with a Starship on SI floats.
+
+    The ship burns burn_fraction of its fuel on departure, cruises, and brakes to
+    rest at destination_distance.
+
+    Returns:
+        (arrival_time, cruise_velocity, fuel_remaining) in s, m/s and kg.
+        Raises ValueError or NotImplementedError if the mission cannot be flown.
+    """
+    ship = Starship(payload_mass * kg,
+                    {'main': Engine(fuel_mass * kg, exhaust_velocity * m / s)},
+                    destination_distance=destination_distance * m,
+                    check_units=False,
+                    record_messages=False)
+    cruise_velocity = ship.accelerate(fuel_mass=burn_fraction * fuel_mass * kg)
+    braking_distance = cruise_velocity ** 2 / (2 * g)
+    cruise_distance = ship.destination_distance - ship.position - braking_distance
+    if cruise_distance / m < 0:
+        raise ValueError("The ship has no room to cruise before braking.")
+    ship.cruise(cruise_distance)
+    ship.accelerate(decelerate=True)
+    return ship.time / s, cruise_velocity / (m / s), ship.fuel_mass() / kg
+
+
+def _run_chunk(configurations):
+    """Fly every row of a (n, 5) float array; this is what runs in the workers."""
+    results = np.zeros(len(configurations), dtype=result_dtype)
+    for name, column in zip(result_dtype.names[:5], configurations.T):
+        results[name] = column
+    for row, configuration in zip(results, configurations):
+        try:
+            row['arrival_time'], row['cruise_velocity'], row['fuel_remaining'] = fly_standard_mission(*configuration)
+            row['feasible'] = True
+        except (ValueError, NotImplementedError):
+            row['arrival_time'] = row['cruise_velocity'] = row['fuel_remaining'] = np.nan
+    return results
+
+
+def run_sweep(configurations, max_workers=None, chunk_size=4096):
+    """Fly the standard mission for every configuration in a process pool.
+
+    Args:
+        configurations: sequence of tuples
+            (payload_mass, fuel_mass, exhaust_velocity, burn_fraction, destination_distance)
+            as unit quantities (burn_fraction is a plain number), or an (n, 5) float
+            array already in kg, kg, m/s, 1, m.
+        max_workers: int
+            Number of worker processes. Defaults to the number of CPUs.
+        chunk_size: int
+            Configurations sent to a worker at a time.
+
+    Returns:
+        Structured array with result_dtype, one row per configuration, in order.
+    """
+    if isinstance(configurations, np.ndarray):
+        table = np.asarray(configurations, dtype=float)
+    else:
+        table = np.array([(magnitude(payload, kg),
+                           magnitude(fuel, kg),
+                           magnitude(exhaust_velocity, m / s),
+                           burn_fraction,
+                           magnitude(distance, m))
+                          for payload, fuel, exhaust_velocity, burn_fraction, distance in configurations],
+                         dtype=float).reshape(-1, 5)
+    chunks = [table[i:i + chunk_size] for i in range(0, len(table), chunk_size)]
+    with ProcessPoolExecutor(max_workers) as executor:
+        results = list(executor.map(_run_chunk, chunks))
+    return np.concatenate(results) if results else np.zeros(0, dtype=result_dtype)
+
+
+def sweep_grid(payload_masses, fuel_masses, exhaust_velocities, burn_fractions, destination_distances, **kwargs):
+    """Fly the standard mission over the full grid of the given axes.
+
+    Each axis is a quantity array such as ``kg * np.array([1, 2, 5])`` (a plain
+    array for burn_fractions) and is converted to SI once. Keyword arguments
+    are passed to run_sweep.
+    """
+    axes = [np.atleast_1d(magnitude(payload_masses, kg)),
+            np.atleast_1d(magnitude(fuel_masses, kg)),
+            np.atleast_1d(magnitude(exhaust_velocities, m / s)),
+            np.atleast_1d(burn_fractions),
+            np.atleast_1d(magnitude(destination_distances, m))]
+    table = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 5).astype(float)
+    return run_sweep(table, **kwargs)
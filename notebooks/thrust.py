@@ -0,0 +1,62 @@
+"""Closed-form burns at constant thrust.
+
+Starship.accelerate normally burns at a constant acceleration, throttling
+the engine down as the ship gets lighter. A real engine more often runs at
+constant thrust F and so constant mass flow mdot = F / ve, and the
+acceleration F / m rises as the fuel burns. Starting from mass m0, after a
+time t the mass is m = m0 - mdot * t and the ship has gained
+
+    velocity:  ve * log(m0 / m)
+    distance:  ve * t - ve * (m / mdot) * log(m0 / m)
+
+The distance is evaluated as (ve**2 / a0) * (r + (1 - r) * log(1 - r)),
+with r the fraction of m0 burnt and a0 the acceleration at ignition, by its
+series for small r so that short burns keep their precision. Nothing is
+integrated; burns are sampled at any number of points in one vectorized
+evaluation. Samples are spaced evenly in velocity, so they crowd toward the
+end of the burn where the acceleration is highest and the trajectory bends
+most.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+ThrustBurn = namedtuple('ThrustBurn', ['time', 'distance', 'velocity', 'fuel_burnt'])
+
+
+def constant_thrust_burn(initial_mass, fuel_burnt, exhaust_velocity, initial_acceleration, samples=0):
+    """Samples of a constant-thrust burn, relative to the ship at ignition, SI floats.
+
+    Args:
+        initial_mass: float, kg, at ignition
+        fuel_burnt: float, kg
+        exhaust_velocity: float, m/s
+        initial_acceleration: float, m/s**2, thrust / initial_mass
+        samples: int, points to return between ignition and burnout
+
+    Returns:
+        ThrustBurn of arrays (samples + 1,) of the time (s), distance (m) and
+        velocity (m/s) gained, and the fuel burnt (kg), at each sample and,
+        last, at burnout. Distance excludes the ship's initial velocity times
+        the time.
+    """
+    delta_v = -exhaust_velocity * np.log1p(-fuel_burnt / initial_mass)
+    velocity = delta_v * np.arange(1, samples + 2) / (samples + 1)
+    velocity[-1] = delta_v
+    # Fraction of the initial mass burnt
+    burnt = -np.expm1(-velocity / exhaust_velocity)
+    burnt[-1] = fuel_burnt / initial_mass
+    scale = exhaust_velocity / initial_acceleration
+    return ThrustBurn(time=scale * burnt,
+                      distance=scale * exhaust_velocity * _distance_factor(burnt),
+                      velocity=velocity,
+                      fuel_burnt=initial_mass * burnt)
+
+
+def _distance_factor(r):
+    """r + (1 - r) * log(1 - r), by its series r**2 / 2 + r**3 / 6 + ... for small r."""
+    series = r * r * (1 / 2 + r * (1 / 6 + r * (1 / 12 + r * (1 / 20 + r / 30))))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        direct = r + (1 - r) * np.log1p(-r)
+    return np.where(r < 1e-3, series, np.where(r < 1, direct, r))
@@ -0,0 +1,228 @@
+"""Barnes-Hut octree gravity for large N-body systems.
+
+Direct summation in nbody.py costs O(n**2) per step. Here the bodies are
+sorted along a Morton (Z-order) curve and grouped into an octree whose
+nodes store their mass and centre of mass. A distant node acts as a point
+mass when width / distance < theta, the opening angle, and is opened into
+its children otherwise, giving O(n log n) per step. theta = 0 is exact (up
+to summation order); larger values trade accuracy for speed, with
+theta = 0.5 a usual choice.
+
+Both the tree build and the walk are vectorized. Bodies walk the tree in
+groups, the largest nodes holding at most group_size bodies: a node is
+approximated for a whole group when the opening test holds from everywhere
+in the group's bounding sphere. The walk advances every (group, node) pair
+of a chunk of groups one tree level per pass, and the accepted interactions
+are summed as dense (body, source) arrays, so no Python code runs per body
+or per node.
+"""
+
+import numpy as np
+
+from nbody import G
+
+_MAX_DEPTH = 21  # bits per axis in a 64 bit Morton key
+
+
+def _spread_bits(v):
+    """Insert two zero bits between each of the low 21 bits of v (uint64 array)."""
+    v = v & np.uint64(0x1fffff)
+    v = (v | v << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    v = (v | v << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    v = (v | v << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    v = (v | v << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    v = (v | v << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return v
+
+
+def _segment_sums(values, starts, counts):
+    """Sum values (n, ...) over the sorted, non-overlapping ranges [start, start + count)."""
+    padded = np.concatenate([values, np.zeros((1,) + values.shape[1:])])
+    bounds = np.column_stack([starts, starts + counts]).ravel()
+    return np.add.reduceat(padded, bounds, axis=0)[::2]
+
+
+def _expand(items, starts, counts):
+    """Pair each item with every index in its range [start, start + count)."""
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(items, counts), np.repeat(starts, counts) + offsets
+
+
+class Octree:
+    """Barnes-Hut octree over bodies with positions (n, 3) and masses (n,), SI units.
+
+    Args:
+        positions: array (n, 3), meters
+        masses: array (n,), kilograms
+        max_depth: int, at most 21; bodies closer than size / 2**max_depth
+            share a leaf and are summed directly
+    """
+    def __init__(self, positions, masses, max_depth=_MAX_DEPTH):
+        self.positions = np.asarray(positions, dtype=float)
+        self.masses = np.asarray(masses, dtype=float)
+        self.max_depth = max_depth
+        self.lower = self.positions.min(axis=0)
+        self.size = max(float((self.positions.max(axis=0) - self.lower).max()), np.finfo(float).tiny) * (1 + 1e-9)
+        self.keys = self._keys(self.positions)
+        self.order = np.argsort(self.keys, kind='stable')
+        sorted_keys = self.keys[self.order]
+        sorted_masses = self.masses[self.order]
+        sorted_moments = self.positions[self.order] * sorted_masses[:, np.newaxis]
+
+        # Build level by level, only splitting nodes holding more than one body.
+        # The bodies of a node are a contiguous range of the sorted order.
+        levels = []
+        active = np.arange(len(sorted_keys))
+        for level in range(max_depth + 1):
+            prefix = sorted_keys[active] >> np.uint64(3 * (max_depth - level))
+            first = np.concatenate([[0], np.flatnonzero(np.diff(prefix)) + 1])
+            counts = np.diff(np.append(first, len(prefix)))
+            levels.append((np.full(len(first), level), prefix[first], active[first], counts))
+            split = counts > 1
+            if level == max_depth or not split.any():
+                break
+            active = active[np.repeat(split, counts)]
+
+        self.level, prefix, self.start, self.count = (np.concatenate(column) for column in zip(*levels))
+        self.mass = _segment_sums(sorted_masses, self.start, self.count)
+        self.center = _segment_sums(sorted_moments, self.start, self.count) / self.mass[:, np.newaxis]
+        # Exactly, so that a body finds itself at zero distance
+        single = self.count == 1
+        self.center[single] = self.positions[self.order[self.start[single]]]
+        self.width = self.size / 2.0 ** self.level
+        self.leaf = single | (self.level == max_depth)
+        # Range of Morton keys inside each node
+        shift = (3 * (max_depth - self.level)).astype(np.uint64)
+        self.key_low = prefix << shift
+        self.key_high = self.key_low + ((np.uint64(1) << shift) - np.uint64(1))
+        # (x, y, z, mass) rows: every node, then every body
+        self.sources = np.concatenate([np.column_stack([self.center, self.mass]),
+                                       np.column_stack([self.positions, self.masses])]).T.copy()
+
+        # Children of a node are a contiguous block of the next level
+        offsets = np.cumsum([0] + [len(level[1]) for level in levels])
+        self.child_start = np.zeros(len(self.level), dtype=int)
+        self.child_count = np.zeros(len(self.level), dtype=int)
+        for i in range(len(levels) - 1):
+            parents = levels[i][1]
+            children = levels[i + 1][1] >> np.uint64(3)
+            left = np.searchsorted(children, parents, 'left')
+            right = np.searchsorted(children, parents, 'right')
+            self.child_start[offsets[i]:offsets[i + 1]] = left + offsets[i + 1]
+            self.child_count[offsets[i]:offsets[i + 1]] = right - left
+
+    def _keys(self, points):
+        scaled = (points - self.lower) / self.size * 2 ** self.max_depth
+        cells = np.clip(np.floor(scaled), 0, 2 ** self.max_depth - 1).astype(np.uint64)
+        return (_spread_bits(cells[:, 0])
+                | _spread_bits(cells[:, 1]) << np.uint64(1)
+                | _spread_bits(cells[:, 2]) << np.uint64(2))
+
+    def accelerations(self, theta=0.5, G=G, softening=0.0, group_size=32, chunk_size=256):
+        """Accelerations (n, 3) of every body due to all the others, meters / second**2"""
+        # Groups are the largest nodes holding at most group_size bodies
+        # (every node but the root is a child, in order)
+        parent_count = np.append(np.inf, np.repeat(self.count, self.child_count))
+        group = np.flatnonzero(((self.count <= group_size) | self.leaf) & (parent_count > group_size))
+        group = group[np.argsort(self.start[group])]
+        sorted_result = self._accelerations(self.positions[self.order], self.keys[self.order],
+                                            self.count[group], theta, G, softening, chunk_size)
+        result = np.empty_like(sorted_result)
+        result[self.order] = sorted_result
+        return result
+
+    def accelerations_at(self, points, theta=0.5, G=G, softening=0.0, chunk_size=256):
+        """Accelerations (m, 3) at arbitrary points due to the bodies, meters / second**2"""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        return self._accelerations(points, self._keys(points), np.ones(len(points), dtype=int),
+                                   theta, G, softening, chunk_size)
+
+    def _accelerations(self, points, keys, group_count, theta, G, softening, chunk_size):
+        """Accelerations at points split into consecutive groups of group_count points."""
+        result = np.empty(points.shape)
+        group_start = np.cumsum(group_count) - group_count
+        first = 0
+        while first < len(group_count):
+            # Groups holding about chunk_size points at a time
+            last = max(int(np.searchsorted(group_start, group_start[first] + chunk_size)), first + 1)
+            begin, end = group_start[first], group_start[last - 1] + group_count[last - 1]
+            chunk_points, chunk_keys = points[begin:end], keys[begin:end]
+            starts, counts = group_start[first:last] - begin, group_count[first:last]
+            center = np.add.reduceat(chunk_points, starts, axis=0) / counts[:, np.newaxis]
+            radius = np.maximum.reduceat(
+                np.linalg.norm(chunk_points - np.repeat(center, counts, axis=0), axis=1), starts)
+            pair_group, pair_source = self._interactions(center, radius, np.minimum.reduceat(chunk_keys, starts),
+                                                         np.maximum.reduceat(chunk_keys, starts), theta)
+            result[begin:end] = G * self._evaluate(chunk_points, np.repeat(np.arange(last - first), counts),
+                                                   pair_group, pair_source, softening)
+            first = last
+        return result
+
+    def _interactions(self, center, radius, first_key, last_key, theta):
+        """Walk the tree for groups of points, returning the (group, source) pairs to sum.
+
+        Sources index self.sources: nodes accepted as point masses, then
+        single bodies from crowded leaves.
+        """
+        found_group, found_source = [], []
+        # Frontier of (group, node) pairs, starting at the root
+        pair_group = np.arange(len(center))
+        pair_node = np.zeros(len(center), dtype=int)
+        while len(pair_group):
+            separation = self.center[pair_node] - center[pair_group]
+            distance = np.sqrt(np.einsum('ij,ij->i', separation, separation)) - radius[pair_group]
+            leaf = self.leaf[pair_node]
+            far = ~leaf & (distance > 0) & (self.width[pair_node] < theta * distance)
+            # Never approximate a node that may hold one of the group's points
+            candidates = np.flatnonzero(far)
+            overlaps = ((self.key_low[pair_node[candidates]] <= last_key[pair_group[candidates]])
+                        & (self.key_high[pair_node[candidates]] >= first_key[pair_group[candidates]]))
+            far[candidates[overlaps]] = False
+
+            # Far nodes and single body leaves act as point masses
+            direct = far | (leaf & (self.count[pair_node] == 1))
+            found_group.append(pair_group[direct])
+            found_source.append(pair_node[direct])
+            # Leaves at max_depth holding several bodies are summed body by body
+            crowded = leaf & ~direct
+            if crowded.any():
+                group, body = _expand(pair_group[crowded], self.start[pair_node[crowded]],
+                                      self.count[pair_node[crowded]])
+                found_group.append(group)
+                found_source.append(len(self.level) + self.order[body])
+
+            opened = ~leaf & ~far
+            pair_group, pair_node = _expand(pair_group[opened], self.child_start[pair_node[opened]],
+                                            self.child_count[pair_node[opened]])
+        return np.concatenate(found_group), np.concatenate(found_source)
+
+    def _evaluate(self, points, point_group, pair_group, pair_source, softening):
+        """Sum mass * separation / distance**3 over the sources of each point's group.
+
+        Each group's sources are laid out as a row of a dense array, padded
+        with massless sources, so the sums are plain array arithmetic. A
+        source at zero distance (a body and itself) contributes nothing.
+        """
+        n_groups = point_group[-1] + 1
+        order = np.argsort(pair_group, kind='stable')
+        pair_group, pair_source = pair_group[order], pair_source[order]
+        lengths = np.bincount(pair_group, minlength=n_groups)
+        slot = np.arange(len(pair_group)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        sources = np.zeros((4, n_groups, max(lengths.max(), 1)))
+        sources[:, pair_group, slot] = self.sources[:, pair_source]
+
+        dx, dy, dz = (sources[axis][point_group] - points[:, axis, np.newaxis] for axis in range(3))
+        distance_squared = dx * dx
+        distance_squared += dy * dy
+        distance_squared += dz * dz
+        distance_squared += softening ** 2
+        weight = np.sqrt(distance_squared)
+        weight *= distance_squared
+        np.divide(sources[3][point_group], weight, out=weight, where=distance_squared > 0)
+        weight[distance_squared == 0] = 0.0
+        return np.column_stack([np.einsum('pl,pl->p', weight, d) for d in (dx, dy, dz)])
+
+
+def accelerations(positions, masses, theta=0.5, G=G, softening=0.0):
+    """Barnes-Hut accelerations (n, 3) of every body due to all the others, meters / second**2"""
+    return Octree(positions, masses).accelerations(theta, G, softening)
@@ -7,51 +7,24 @@ cylinder. z points toward the axis of rotation. We assume that
 distances are much smaller than the radius of the cylinder.
 The result is projectile motion as observed by an occupant of the 
 habitat.
+
+The trajectory is computed headless by habitat.integrate_trajectory
+and streamed through sinks: the ball is animated every few steps and
+the graphs get one LTTB-decimated point per bucket of steps, sent to
+the browser in batches.
 """
 
 from vpython import *
 from copy import copy
+import math
 import numpy as np
+
+from habitat import displacement, integrate_trajectory
+from sinks import EveryK, GcurveSink, LTTB, Tee
+
 scene.forward = vector(1,0,0)
 scene.up = vector(0,0,1)
 
-# Constants
-cylinder_radius = 3200  # meters
-rotation_period = 114  # seconds
-pi = 3.14159
-
-# Derived quantities
-angular_velocity = vector(2 * pi / rotation_period, 0, 0)
-
-# Apparent accelerations
-def centrifugal_accel(radius):
-    """Cetrifugal acceleration for scalar radius"""
-    accel = radius * (2 * pi / rotation_period)**2
-    return accel * vector(0, 0, -1)
-
-def coriolis_accel(velocity):
-    """Coriolis acceleration for the given velocity.
-
-    Args:
-        velocity: vector, velocity relative to rotation frame, meters
-
-    Returns:
-        acceleration: vector, meters / second**2
-    """
-    accel = -2 * angular_velocity.cross(vector(0,0,velocity.z))
-    return accel
-
-def displacement(pos, p_init):
-    x1 = 0
-    y1 = 0
-    x2 = p_init.x
-    y2 = p_init.y
-    x0 = pos.x
-    y0 = pos.y
-    distance = np.abs((x2 - x1) * (y1 - y0) - (x1 - x0) * (y2 - y1)) / \
-               np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-    return distance
-
 ground = box(pos=vector(0,0,0), size=vector(90,90,0.5), color=color.green)
 
 z_graph = graph(xtitle='time (s)', ytitle='height (m)')
@@ -84,24 +57,31 @@ ball.p = p_init
 earth_ball.p = p_init
 
 dt = 1e-3
-not_landed = True
-t = 0.0
-
-while not_landed:
-    rate(200)
-    r = cylinder_radius - ball.pos.z
-    a_cent = centrifugal_accel(r)
-    a_cor = coriolis_accel(ball.p / ball.mass)
-    ball.p = ball.p + ball.mass * (
-        a_cent + a_cor) * dt 
-    ball.pos = ball.pos + (ball.p / ball.mass) * dt
-    earth_ball.p = earth_ball.p + earth_ball.mass * vector(0,0,-9.81) * dt
-    earth_ball.pos = earth_ball.pos + (earth_ball.p / earth_ball.mass) * dt
-    not_landed = r <  cylinder_radius
-    t += dt
-    z_plot.plot(t, ball.pos.z)
-    z_plot_earth.plot(t, earth_ball.pos.z)
-    d_plot.plot(t, displacement(ball.pos, p_init)) 
-    a_cent_plot.plot(t, a_cent.mag)
-    a_cor_plot.plot(t, a_cor.mag)
+steps_per_frame = 10
+steps_per_point = 20
+p_init_array = np.array([p_init.x, p_init.y, p_init.z])
+
+
+class Animation:
+    """Sink that moves the balls to each row it is given."""
+    def write(self, row):
+        rate(200 / steps_per_frame)
+        ball.pos = vector(*row[1:4])
+        earth_ball.pos = vector(*row[7:10])
+
+    def close(self):
+        pass
+
+
+graphs = GcurveSink({z_plot: 3,
+                     z_plot_earth: 9,
+                     d_plot: lambda row: displacement(np.array(row[1:4]), p_init_array),
+                     a_cent_plot: lambda row: math.hypot(*row[10:13]),
+                     a_cor_plot: lambda row: math.hypot(*row[13:16])})
+integrate_trajectory(p_init_array,
+                     mass=ball.mass,
+                     initial_position=(ball.pos.x, ball.pos.y, ball.pos.z),
+                     dt=dt,
+                     sink=Tee(EveryK(Animation(), steps_per_frame),
+                              LTTB(graphs, steps_per_point, column=3)))
 print('Done!')
@@ -0,0 +1,563 @@
+"""Headless physics for projectile motion in artificial gravity.
+
+This is the integrator behind cylinder_projectile.py without any VPython
+rendering, so it can be imported and run in batch. The coordinate system is
+the same: fixed to a point on the inner surface of an O'Neil cylinder, x along
+the long axis of the cylinder, z toward the axis of rotation. The default
+'flat' model assumes distances much smaller than the radius of the cylinder,
+as cylinder_projectile.py does. The 'exact' model uses the full Coriolis
+term, the centrifugal acceleration at the actual distance from the axis and a
+curved floor, and for drag-free flight analytic_trajectory gives the exact
+answer without integrating at all.
+
+Vectors are NumPy arrays of shape (3,) (or (..., 3)) in SI units.
+"""
+
+from collections import namedtuple
+import math
+
+import numpy as np
+
+# Constants
+cylinder_radius = 3200  # meters
+rotation_period = 114  # seconds
+pi = 3.14159
+earth_gravity = np.array([0, 0, -9.81])  # meters / second**2
+
+Trajectory = namedtuple('Trajectory', ['t',
+                                       'position',
+                                       'momentum',
+                                       'earth_position',
+                                       'centrifugal_accel',
+                                       'coriolis_accel'])
+
+
+def angular_velocity(rotation_period=rotation_period):
+    """Angular velocity vector of the habitat, radians / second"""
+    return np.array([2 * pi / rotation_period, 0, 0])
+
+
+# Apparent accelerations
+def centrifugal_accel(radius, rotation_period=rotation_period):
+    """Cetrifugal acceleration for scalar radius (or array of radii)"""
+    accel = np.asarray(radius) * (2 * pi / rotation_period)**2
+    return accel[..., np.newaxis] * np.array([0, 0, -1])
+
+
+def coriolis_accel(velocity, rotation_period=rotation_period):
+    """Coriolis acceleration for the given velocity.
+
+    Only the z (radial) component of the velocity contributes, as in
+    cylinder_projectile.py.
+
+    Args:
+        velocity: array (..., 3), velocity relative to rotation frame, meters / second
+
+    Returns:
+        acceleration: array (..., 3), meters / second**2
+    """
+    radial = np.zeros_like(velocity, dtype=float)
+    radial[..., 2] = velocity[..., 2]
+    return -2 * np.cross(angular_velocity(rotation_period), radial)
+
+
+def axis_distance(position, cylinder_radius=cylinder_radius):
+    """Distance from the axis of rotation for positions (..., 3), meters"""
+    return np.hypot(position[..., 1], cylinder_radius - position[..., 2])
+
+
+def centrifugal_accel_exact(position, cylinder_radius=cylinder_radius, rotation_period=rotation_period):
+    """Centrifugal acceleration at the actual distance from the axis.
+
+    Args:
+        position: array (..., 3), meters
+
+    Returns:
+        acceleration: array (..., 3), pointing away from the axis, meters / second**2
+    """
+    from_axis = np.array(position, dtype=float)
+    from_axis[..., 0] = 0
+    from_axis[..., 2] -= cylinder_radius
+    return from_axis * (2 * pi / rotation_period)**2
+
+
+def coriolis_accel_exact(velocity, rotation_period=rotation_period):
+    """Full Coriolis acceleration -2 omega x v for velocities (..., 3), meters / second**2"""
+    return -2 * np.cross(angular_velocity(rotation_period), velocity)
+
+
+def displacement(pos, p_init):
+    """Distance of pos from the launch direction line in the x, y plane.
+
+    A launch with no horizontal momentum has no direction line, so the
+    distance from the launch point in the x, y plane is used instead.
+
+    Args:
+        pos: array (..., 3), positions, meters
+        p_init: array (3,) or (..., 3), initial momentum
+
+    Returns:
+        distance: float or array, meters
+    """
+    x2, y2 = p_init[..., 0], p_init[..., 1]
+    x0, y0 = pos[..., 0], pos[..., 1]
+    horizontal = np.hypot(x2, y2)
+    vertical = horizontal == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance = np.abs(x2 * (-y0) + x0 * y2) / horizontal
+    return np.where(vertical, np.hypot(x0, y0), distance)
+
+
+def integrate_trajectory(p_init,
+                         mass=0.145,
+                         initial_position=(0, 0, 0.01),
+                         dt=1e-3,
+                         cylinder_radius=cylinder_radius,
+                         rotation_period=rotation_period,
+                         max_steps=10**7,
+                         method='euler',
+                         rtol=1e-9,
+                         atol=1e-9,
+                         model='flat',
+                         sink=None):
+    """Integrate a projectile in the rotating frame until it lands.
+
+    With method='euler' this uses the same fixed-step update as
+    cylinder_projectile.py: momentum first, then position, and the loop
+    stops on the step after the ball reaches the floor.
+
+    With method='dopri5' it uses an adaptive Dormand-Prince 5(4) integrator
+    with error control (rtol, atol) starting from a step of dt, and the last
+    sample is the landing itself, located to integration accuracy. This takes
+    a few hundred steps where the fixed-step method takes tens of thousands.
+
+    model='flat' uses the accelerations and floor of cylinder_projectile.py.
+    model='exact' uses centrifugal_accel_exact and coriolis_accel_exact, and
+    the ball lands when its distance from the axis reaches cylinder_radius.
+
+    Either way a ball under Earth gravity is integrated alongside for comparison.
+
+    Given a sink (see sinks.py) the rows are streamed to it instead of being
+    stored, so a decimating sink keeps memory and plotting cost down on long
+    flights. Rows have the 16 columns of trajectory_rows.
+
+    Args:
+        p_init: array (3,), initial momentum, kg meters / second
+        mass: float, kilograms
+        initial_position: array (3,), meters
+        dt: float, seconds
+        cylinder_radius: float, meters
+        rotation_period: float, seconds
+        max_steps: int, give up (RuntimeError) if the ball has not landed by then
+        method: 'euler' or 'dopri5'
+        rtol, atol: float, error tolerances for 'dopri5'
+        model: 'flat' or 'exact'
+        sink: object with write(row) and close() methods, or None
+
+    Returns:
+        Trajectory of arrays with one row per step: t (n,), position, momentum,
+        earth_position, centrifugal_accel and coriolis_accel (n, 3). The
+        accelerations are those applied during the step ending at t.
+        With a sink, whatever sink.close() returns.
+    """
+    if model not in ('flat', 'exact'):
+        raise ValueError(f"Unknown acceleration model {model!r}. Use 'flat' or 'exact'.")
+    exact = model == 'exact'
+    if method == 'dopri5':
+        trajectory = _integrate_dopri5(p_init, mass, initial_position, dt, cylinder_radius,
+                                       rotation_period, max_steps, rtol, atol, exact)
+        if sink is None:
+            return trajectory
+        for row in trajectory_rows(trajectory):
+            sink.write(row)
+        return sink.close()
+    if method != 'euler':
+        raise ValueError(f"Unknown integration method {method!r}. Use 'euler' or 'dopri5'.")
+
+    omega = 2 * pi / rotation_period
+    omega_squared = omega ** 2
+    px, py, pz = (float(v) for v in p_init)
+    x, y, z = (float(v) for v in initial_position)
+    epx, epy, epz = px, py, pz
+    ex, ey, ez = x, y, z
+    g_z = float(earth_gravity[2])
+
+    capacity = 1024
+    data = np.empty((capacity, 16))
+    t = 0.0
+    n = 0
+    not_landed = True
+    while not_landed:
+        if n == max_steps:
+            raise RuntimeError(f"Projectile did not land within {max_steps} steps.")
+        if exact:
+            r = math.hypot(y, cylinder_radius - z)
+            a_cent_y = y * omega_squared
+            a_cent_z = (z - cylinder_radius) * omega_squared
+            a_cor_y = 2 * omega * pz / mass
+            a_cor_z = -2 * omega * py / mass
+        else:
+            r = cylinder_radius - z
+            a_cent_y = 0.0
+            a_cent_z = -r * omega_squared
+            a_cor_y = 2 * omega * pz / mass
+            a_cor_z = 0.0
+        py = py + mass * (a_cent_y + a_cor_y) * dt
+        pz = pz + mass * (a_cent_z + a_cor_z) * dt
+        x = x + (px / mass) * dt
+        y = y + (py / mass) * dt
+        z = z + (pz / mass) * dt
+        epz = epz + mass * g_z * dt
+        ex = ex + (epx / mass) * dt
+        ey = ey + (epy / mass) * dt
+        ez = ez + (epz / mass) * dt
+        not_landed = r < cylinder_radius
+        t += dt
+        row = (t, x, y, z, px, py, pz, ex, ey, ez, 0, a_cent_y, a_cent_z, 0, a_cor_y, a_cor_z)
+        if sink is not None:
+            sink.write(row)
+        else:
+            if n == capacity:
+                capacity *= 2
+                grown = np.empty((capacity, 16))
+                grown[:n] = data[:n]
+                data = grown
+            data[n] = row
+        n += 1
+
+    if sink is not None:
+        return sink.close()
+    return trajectory_from_rows(data[:n])
+
+
+def trajectory_rows(trajectory):
+    """Return a Trajectory as an (n, 16) array of rows.
+
+    The columns are t, position (3), momentum (3), earth_position (3),
+    centrifugal_accel (3) and coriolis_accel (3).
+    """
+    return np.column_stack(trajectory)
+
+
+def trajectory_from_rows(rows):
+    """Return the Trajectory for an (n, 16) array of rows, such as an ArraySink collects."""
+    return Trajectory(t=rows[:, 0],
+                      position=rows[:, 1:4],
+                      momentum=rows[:, 4:7],
+                      earth_position=rows[:, 7:10],
+                      centrifugal_accel=rows[:, 10:13],
+                      coriolis_accel=rows[:, 13:16])
+
+
+# Dormand-Prince 5(4) tableau
+_DOPRI_A = [np.array([]),
+            np.array([1/5]),
+            np.array([3/40, 9/40]),
+            np.array([44/45, -56/15, 32/9]),
+            np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+            np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+            np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])]
+_DOPRI_E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+
+
+def _rotating_frame_derivative(state, omega, radius, exact):
+    """d/dt of [x, y, z, vx, vy, vz] under the accelerations used by integrate_trajectory."""
+    if exact:
+        return np.array([state[3], state[4], state[5],
+                         0.0,
+                         state[1] * omega ** 2 + 2 * omega * state[5],
+                         (state[2] - radius) * omega ** 2 - 2 * omega * state[4]])
+    return np.array([state[3], state[4], state[5],
+                     0.0, 2 * omega * state[5], -(radius - state[2]) * omega ** 2])
+
+
+def _height(state, radius, exact):
+    """Return (height above the floor, its rate of change) for a state vector."""
+    if exact:
+        distance = math.hypot(state[1], radius - state[2])
+        return radius - distance, -(state[1] * state[4] + (state[2] - radius) * state[5]) / distance
+    return state[2], state[5]
+
+
+def _dopri5_step(f, state, k1, h):
+    """One Dormand-Prince step. Returns (new state, derivative at new state, error estimate)."""
+    k = [k1]
+    for a in _DOPRI_A[1:6]:
+        k.append(f(state + h * np.dot(a, k)))
+    new_state = state + h * np.dot(_DOPRI_A[6], k[:6])
+    k.append(f(new_state))
+    return new_state, k[6], h * np.dot(_DOPRI_E, k)
+
+
+def _integrate_dopri5(p_init, mass, initial_position, dt, cylinder_radius, rotation_period,
+                      max_steps, rtol, atol, exact):
+    omega = 2 * pi / rotation_period
+    f = lambda state: _rotating_frame_derivative(state, omega, cylinder_radius, exact)
+    state = np.concatenate([np.asarray(initial_position, dtype=float),
+                            np.asarray(p_init, dtype=float) / mass])
+    derivative = f(state)
+    t, h = 0.0, dt
+    times, states, accels = [], [], []
+    for _ in range(max_steps):
+        new_state, new_derivative, error = _dopri5_step(f, state, derivative, h)
+        scale = atol + rtol * np.maximum(np.abs(state), np.abs(new_state))
+        error_norm = np.sqrt(np.mean((error / scale) ** 2))
+        if error_norm > 1:
+            h *= max(0.2, 0.9 * error_norm ** -0.2)
+            continue
+
+        height = _height(state, cylinder_radius, exact)[0]
+        new_height = _height(new_state, cylinder_radius, exact)[0]
+        if height > 0 >= new_height:
+            # Landed during this step: Newton iteration on the step size, each
+            # iterate integrated from the start of the step to full accuracy.
+            tau = h * height / (height - new_height)
+            for _ in range(20):
+                new_state, new_derivative, _ = _dopri5_step(f, state, derivative, tau)
+                new_height, climb_rate = _height(new_state, cylinder_radius, exact)
+                correction = new_height / climb_rate
+                tau -= correction
+                if abs(correction) <= 1e-15 * max(t, 1.0):
+                    break
+            new_state, new_derivative, _ = _dopri5_step(f, state, derivative, tau)
+            times.append(t + tau)
+            states.append(new_state)
+            accels.append(new_derivative[3:])
+            break
+
+        t += h
+        times.append(t)
+        states.append(new_state)
+        accels.append(new_derivative[3:])
+        state, derivative = new_state, new_derivative
+        h *= min(5.0, 0.9 * max(error_norm, 1e-10) ** -0.2)
+    else:
+        raise RuntimeError(f"Projectile did not land within {max_steps} steps.")
+
+    t = np.array(times)
+    states = np.array(states)
+    accels = np.array(accels)
+    p0 = np.asarray(p_init, dtype=float)
+    earth_position = (np.asarray(initial_position, dtype=float) + np.outer(t, p0 / mass)
+                      + 0.5 * np.outer(t ** 2, earth_gravity))
+    if exact:
+        centrifugal = centrifugal_accel_exact(states[:, :3], cylinder_radius, rotation_period)
+    else:
+        centrifugal = centrifugal_accel(cylinder_radius - states[:, 2], rotation_period)
+    return Trajectory(t=t,
+                      position=states[:, :3],
+                      momentum=states[:, 3:] * mass,
+                      earth_position=earth_position,
+                      centrifugal_accel=centrifugal,
+                      coriolis_accel=accels - centrifugal)
+
+
+def _landing_time(start, velocity, cylinder_radius):
+    """First time a straight line from start (relative to the axis, inside the cylinder) reaches the wall.
+
+    Solves |start + velocity * t| = cylinder_radius in the y, z plane. Works on
+    arrays (..., 3).
+    """
+    a = velocity[..., 1]**2 + velocity[..., 2]**2
+    b = 2 * (start[..., 1] * velocity[..., 1] + start[..., 2] * velocity[..., 2])
+    c = start[..., 1]**2 + start[..., 2]**2 - cylinder_radius**2
+    root = np.sqrt(b**2 - 4 * a * c)
+    # The positive root, written to avoid cancellation for either sign of b
+    with np.errstate(divide='ignore'):
+        return np.where(b >= 0, 2 * c / (-b - root), (-b + root) / (2 * a))
+
+
+def _inertial_launch(p_init, mass, initial_position, cylinder_radius, rotation_period):
+    """Return (start relative to the axis, inertial velocity, angular speed) for launches (..., 3)."""
+    omega = 2 * pi / np.asarray(rotation_period, dtype=float)
+    start = np.array(initial_position, dtype=float) + np.zeros(np.shape(p_init))
+    start[..., 2] -= cylinder_radius
+    velocity = np.asarray(p_init, dtype=float) / np.asarray(mass, dtype=float)[..., np.newaxis]
+    # Add the velocity of the launch point itself, omega x r
+    inertial = velocity.copy()
+    inertial[..., 1] -= omega * start[..., 2]
+    inertial[..., 2] += omega * start[..., 1]
+    return start, inertial, omega
+
+
+def _to_rotating_frame(inertial_position, t, omega, cylinder_radius):
+    """Rotate axis-relative inertial positions back into the habitat frame at times t."""
+    angle = omega * t
+    cos, sin = np.cos(angle), np.sin(angle)
+    y, z = inertial_position[..., 1], inertial_position[..., 2]
+    position = np.empty(np.shape(inertial_position))
+    position[..., 0] = inertial_position[..., 0]
+    position[..., 1] = y * cos + z * sin
+    position[..., 2] = -y * sin + z * cos + cylinder_radius
+    return position
+
+
+def analytic_trajectory(p_init,
+                        mass=0.145,
+                        initial_position=(0, 0, 0.01),
+                        cylinder_radius=cylinder_radius,
+                        rotation_period=rotation_period,
+                        samples=1001):
+    """Exact drag-free trajectory from the inertial-frame straight line.
+
+    Seen from outside the habitat the projectile moves in a straight line at
+    its launch velocity plus the velocity of the launch point. Rotating that
+    line back into the habitat frame gives the exact solution of the 'exact'
+    model, so no integration steps are needed.
+
+    Args:
+        p_init: array (3,), initial momentum, kg meters / second
+        mass: float, kilograms
+        initial_position: array (3,), meters
+        cylinder_radius: float, meters
+        rotation_period: float, seconds
+        samples: int, number of evenly spaced times from launch to landing
+
+    Returns:
+        Trajectory sampled at samples times, the last one being the landing.
+    """
+    start, inertial, omega = _inertial_launch(np.asarray(p_init, dtype=float), mass, initial_position,
+                                              cylinder_radius, rotation_period)
+    t = np.linspace(0, float(_landing_time(start, inertial, cylinder_radius)), samples)
+    position = _to_rotating_frame(start + np.outer(t, inertial), t, omega, cylinder_radius)
+    # Velocity in the habitat frame: rotated inertial velocity minus omega x r
+    from_axis_y, from_axis_z = position[:, 1], position[:, 2] - cylinder_radius
+    cos, sin = np.cos(omega * t), np.sin(omega * t)
+    velocity = np.column_stack([np.full(samples, inertial[0]),
+                                inertial[1] * cos + inertial[2] * sin + omega * from_axis_z,
+                                -inertial[1] * sin + inertial[2] * cos - omega * from_axis_y])
+    p0 = np.asarray(p_init, dtype=float)
+    earth_position = (np.asarray(initial_position, dtype=float) + np.outer(t, p0 / mass)
+                      + 0.5 * np.outer(t ** 2, earth_gravity))
+    return Trajectory(t=t,
+                      position=position,
+                      momentum=velocity * mass,
+                      earth_position=earth_position,
+                      centrifugal_accel=centrifugal_accel_exact(position, cylinder_radius, rotation_period),
+                      coriolis_accel=coriolis_accel_exact(velocity, rotation_period))
+
+
+Landing = namedtuple('Landing', ['landing_position',
+                                 'flight_time',
+                                 'coriolis_displacement'])
+
+
+def landing(p_init,
+            mass=0.145,
+            launch_height=0.01,
+            cylinder_radius=cylinder_radius,
+            rotation_period=rotation_period):
+    """Where and when drag-free projectiles land, without integrating.
+
+    The landing point is where the inertial straight line of
+    analytic_trajectory meets the cylinder, rotated back by omega * t, so the
+    answer is exact for the 'exact' model and costs the same for any flight
+    time. Every argument broadcasts, so millions of launches can be evaluated
+    in one call.
+
+    Args:
+        p_init: array (3,) or (n, 3), initial momenta, kg meters / second
+        mass: float or array (n,), kilograms
+        launch_height: float or array (n,), meters above the floor
+        cylinder_radius: float or array (n,), meters
+        rotation_period: float or array (n,), seconds
+
+    Returns:
+        Landing of landing_position (..., 3), flight_time (...,) and
+        coriolis_displacement (...,), the sideways deflection of the landing
+        point from the launch direction, in meters.
+    """
+    p_init = np.asarray(p_init, dtype=float)
+    launch_position = np.zeros(p_init.shape)
+    launch_position[..., 2] = launch_height
+    start, inertial, omega = _inertial_launch(p_init, mass, launch_position, cylinder_radius, rotation_period)
+    flight_time = _landing_time(start, inertial, cylinder_radius)
+    position = _to_rotating_frame(start + flight_time[..., np.newaxis] * inertial,
+                                  flight_time, omega, cylinder_radius)
+    return Landing(landing_position=position,
+                   flight_time=flight_time,
+                   coriolis_displacement=displacement(position, p_init))
+
+
+Ensemble = namedtuple('Ensemble', ['landing_position',
+                                   'flight_time',
+                                   'max_displacement'])
+
+
+def integrate_ensemble(p_init,
+                       launch_height=0.01,
+                       cylinder_radius=cylinder_radius,
+                       rotation_period=rotation_period,
+                       mass=0.145,
+                       dt=1e-3,
+                       max_steps=10**7):
+    """Integrate many launches at once until every projectile has landed.
+
+    Each case follows exactly the update and landing rule of
+    integrate_trajectory, but all cases advance together as NumPy arrays.
+    Cases are dropped from the working arrays as they land, so the cost of
+    each step is proportional to the number still in flight.
+
+    Args:
+        p_init: array (n, 3), initial momenta, kg meters / second
+        launch_height: float or array (n,), meters above the floor
+        cylinder_radius: float or array (n,), meters
+        rotation_period: float or array (n,), seconds
+        mass: float or array (n,), kilograms
+        dt: float, seconds
+        max_steps: int, give up (RuntimeError) if any case has not landed by then
+
+    Returns:
+        Ensemble of landing_position (n, 3), flight_time (n,) and
+        max_displacement (n,), the largest sideways (Coriolis) deflection
+        from the launch direction during the flight, in meters.
+    """
+    p_init = np.atleast_2d(np.asarray(p_init, dtype=float))
+    n = len(p_init)
+    height, radius, period, mass = (np.broadcast_to(np.asarray(v, dtype=float), (n,)).copy()
+                                    for v in (launch_height, cylinder_radius, rotation_period, mass))
+    omega = 2 * pi / period
+    omega_squared = omega ** 2
+    px, py, pz = p_init.T.copy()
+    x, y, z = np.zeros(n), np.zeros(n), height
+    # Unit vector along the launch direction in the x, y plane, for displacement();
+    # vertical launches have none and are measured from the launch point
+    horizontal = np.hypot(p_init[:, 0], p_init[:, 1])
+    vertical = horizontal == 0
+    direction = p_init[:, :2] / np.where(vertical, 1.0, horizontal)[:, np.newaxis]
+    max_d = np.zeros(n)
+
+    landing_position = np.empty((n, 3))
+    flight_time = np.empty(n)
+    max_displacement = np.empty(n)
+    index = np.arange(n)
+
+    t = 0.0
+    for _ in range(max_steps):
+        r = radius - z
+        a_cent_z = -r * omega_squared
+        a_cor_y = 2 * omega * pz / mass
+        py = py + mass * a_cor_y * dt
+        pz = pz + mass * a_cent_z * dt
+        x = x + (px / mass) * dt
+        y = y + (py / mass) * dt
+        z = z + (pz / mass) * dt
+        t += dt
+        sideways = np.abs(direction[:, 0] * y - direction[:, 1] * x)
+        if vertical.any():
+            sideways = np.where(vertical, np.hypot(x, y), sideways)
+        np.maximum(max_d, sideways, out=max_d)
+
+        landed = ~(r < radius)
+        if landed.any():
+            done = index[landed]
+            landing_position[done] = np.column_stack([x[landed], y[landed], z[landed]])
+            flight_time[done] = t
+            max_displacement[done] = max_d[landed]
+            flying = ~landed
+            if not flying.any():
+                return Ensemble(landing_position, flight_time, max_displacement)
+            (index, radius, omega, omega_squared, mass, direction, vertical, max_d,
+             px, py, pz, x, y, z) = (a[flying] for a in (index, radius, omega, omega_squared, mass, direction,
+                                                          vertical, max_d, px, py, pz, x, y, z))
+    raise RuntimeError(f"{len(index)} projectiles did not land within {max_steps} steps.")
@@ -0,0 +1,258 @@
+"""Vectorized N-body gravity.
+
+Positions, momenta and masses are NumPy arrays, (n, 3), (n, 3) and (n,), in
+SI units. All pairwise accelerations are computed at once per step, and
+integrate runs headless, returning the trajectory as arrays, so systems of
+any number of bodies (a binary star, Alpha Centauri A/B with Proxima, a
+probe swarm) are simulated the same way. vpython_binarystar.py animates it.
+
+The default method, 'euler', is the update the original binary star
+script used: momenta first, then positions. vpython_binarystar.py now uses
+'verlet', the symplectic velocity Verlet integrator; it and the fourth
+order 'yoshida4' keep the energy error bounded instead of drifting, so they
+reach the same accuracy with far larger steps. integrate records the total
+energy and angular momentum to check.
+"""
+
+from collections import namedtuple
+import os
+
+import numpy as np
+
+from pairwise import SUBSTEPS, inverse_cube
+
+G = 6.7e-11  # Newton gravitational constant, as in vpython_binarystar.py
+_PAIRS_PER_PASS = 2 ** 20
+
+NBodyTrajectory = namedtuple('NBodyTrajectory', ['t', 'positions', 'momenta', 'energy', 'angular_momentum'])
+Checkpoint = namedtuple('Checkpoint', ['t', 'positions', 'momenta', 'masses'])
+
+
+def accelerations_at(points, positions, masses, G=G, softening=0.0):
+    """Gravitational acceleration at points due to bodies at positions.
+
+    A body exactly at a point exerts no force there, so
+    accelerations_at(positions, positions, masses) gives the accelerations of
+    the bodies themselves.
+
+    Args:
+        points: array (m, 3), meters
+        positions: array (n, 3), meters
+        masses: array (n,), kilograms
+        G: float, gravitational constant
+        softening: float, meters, added in quadrature to every separation
+
+    Returns:
+        acceleration: array (m, 3), meters / second**2
+    """
+    if len(points) * len(positions) > _PAIRS_PER_PASS:
+        # Bound the size of the (m, n) temporaries
+        rows = max(_PAIRS_PER_PASS // len(positions), 1)
+        return np.concatenate([accelerations_at(points[i:i + rows], positions, masses, G, softening)
+                               for i in range(0, len(points), rows)])
+    dx, dy, dz = (positions[np.newaxis, :, k] - points[:, np.newaxis, k] for k in range(3))
+    distance_squared = dx * dx + dy * dy + dz * dz + softening ** 2
+    weight = inverse_cube(G * masses, distance_squared)
+    return np.column_stack([(weight * dx).sum(axis=1), (weight * dy).sum(axis=1), (weight * dz).sum(axis=1)])
+
+
+def accelerations(positions, masses, G=G, softening=0.0, theta=None):
+    """Accelerations (n, 3) of every body due to all the others, meters / second**2
+
+    By direct summation, or with a Barnes-Hut tree of opening angle theta
+    (see barnes_hut.py) when theta is given.
+    """
+    if theta is not None:
+        from barnes_hut import Octree
+        return Octree(positions, masses).accelerations(theta, G, softening)
+    return accelerations_at(positions, positions, masses, G, softening)
+
+
+def potential_energy(positions, masses, G=G, softening=0.0):
+    """Gravitational potential energy of the system, joules"""
+    total = 0.0
+    rows = max(_PAIRS_PER_PASS // len(positions), 1)
+    for i in range(0, len(positions), rows):
+        dx, dy, dz = (positions[np.newaxis, :, k] - positions[i:i + rows, np.newaxis, k] for k in range(3))
+        distance = np.sqrt(dx * dx + dy * dy + dz * dz + softening ** 2)
+        inverse = np.zeros_like(distance)
+        np.divide(1.0, distance, out=inverse, where=distance > 0)
+        total += masses[i:i + rows] @ inverse @ masses
+    # Every pair was counted twice
+    return -0.5 * G * total
+
+
+def kinetic_energy(momenta, masses):
+    """Kinetic energy of the system, joules"""
+    return 0.5 * float(np.sum(momenta ** 2 / masses[:, np.newaxis]))
+
+
+def angular_momentum(positions, momenta):
+    """Total angular momentum (3,) about the origin, kg meters**2 / second"""
+    return np.cross(positions, momenta).sum(axis=0)
+
+
+def _kick_drift_kick(positions, momenta, acceleration, masses, dt, substeps, force):
+    """Symplectic step; acceleration is the one at positions and the new one is returned."""
+    masses = masses[:, np.newaxis]
+    for weight in substeps:
+        h = weight * dt
+        momenta = momenta + masses * acceleration * (h / 2)
+        positions = positions + (momenta / masses) * h
+        acceleration = force(positions)
+        momenta = momenta + masses * acceleration * (h / 2)
+    return positions, momenta, acceleration
+
+
+def step(positions, momenta, masses, dt, G=G, softening=0.0, theta=None, method='euler'):
+    """Advance every body by one step of dt seconds. Returns new (positions, momenta).
+
+    method is 'euler', the update of vpython_binarystar.py, or one of the
+    symplectic 'verlet' (velocity Verlet, second order) and 'yoshida4'
+    (fourth order) integrators, which keep energy bounded over long runs.
+    """
+    if method == 'euler':
+        momenta = momenta + masses[:, np.newaxis] * accelerations(positions, masses, G, softening, theta) * dt
+        positions = positions + (momenta / masses[:, np.newaxis]) * dt
+        return positions, momenta
+    if method not in SUBSTEPS:
+        raise ValueError(f"Unknown integration method {method!r}. Use 'euler', 'verlet' or 'yoshida4'.")
+    force = lambda x: accelerations(x, masses, G, softening, theta)
+    positions, momenta, _ = _kick_drift_kick(positions, momenta, force(positions), masses, dt,
+                                             SUBSTEPS[method], force)
+    return positions, momenta
+
+
+def _evolve(positions, momenta, masses, dt, steps, G, softening, theta, method):
+    """Yield (step number, positions, momenta) after each of steps steps."""
+    if method != 'euler' and method not in SUBSTEPS:
+        raise ValueError(f"Unknown integration method {method!r}. Use 'euler', 'verlet' or 'yoshida4'.")
+    force = lambda x: accelerations(x, masses, G, softening, theta)
+    acceleration = None if method == 'euler' else force(positions)
+    for i in range(1, steps + 1):
+        if method == 'euler':
+            positions, momenta = step(positions, momenta, masses, dt, G, softening, theta)
+        else:
+            # Reuse the acceleration from the end of the last step
+            positions, momenta, acceleration = _kick_drift_kick(positions, momenta, acceleration, masses, dt,
+                                                                SUBSTEPS[method], force)
+        yield i, positions, momenta
+
+
+def integrate(positions, momenta, masses, dt, steps, G=G, softening=0.0, record_every=1, theta=None,
+              method='euler', track_conserved=True):
+    """Integrate the system headless for a number of steps.
+
+    Args:
+        positions: array (n, 3), meters
+        momenta: array (n, 3), kg meters / second
+        masses: array (n,), kilograms
+        dt: float, seconds
+        steps: int
+        G: float, gravitational constant
+        softening: float, meters
+        record_every: int, keep every record_every-th step (the initial state
+            and the final step are always kept)
+        theta: float, Barnes-Hut opening angle, or None for direct summation
+        method: 'euler', 'verlet' or 'yoshida4', see step
+        track_conserved: bool, record the total energy and angular momentum
+            at every kept step (the energy is a direct O(n**2) sum)
+
+    Returns:
+        NBodyTrajectory of t (k,), positions and momenta (k, n, 3), energy
+        (k,) in joules and angular_momentum (k, 3) in kg meters**2 / second,
+        the last two None unless track_conserved.
+    """
+    positions = np.array(positions, dtype=float)
+    momenta = np.array(momenta, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    kept = np.arange(0, steps + 1, record_every)
+    if kept[-1] != steps:
+        kept = np.append(kept, steps)
+    position_record = np.empty((len(kept),) + positions.shape)
+    momentum_record = np.empty((len(kept),) + momenta.shape)
+    energy = np.empty(len(kept)) if track_conserved else None
+    spin = np.empty((len(kept), 3)) if track_conserved else None
+
+    def record(j):
+        position_record[j], momentum_record[j] = positions, momenta
+        if track_conserved:
+            energy[j] = kinetic_energy(momenta, masses) + potential_energy(positions, masses, G, softening)
+            spin[j] = angular_momentum(positions, momenta)
+
+    record(0)
+    j = 1
+    for i, positions, momenta in _evolve(positions, momenta, masses, dt, steps, G, softening, theta, method):
+        if i == kept[j]:
+            record(j)
+            j += 1
+    return NBodyTrajectory(t=kept * dt, positions=position_record, momenta=momentum_record,
+                           energy=energy, angular_momentum=spin)
+
+
+def save_checkpoint(path, t, positions, momenta, masses):
+    """Write the state of the system to path as a NumPy .npz file.
+
+    The file is written beside path and renamed over it, so an interrupted
+    write never leaves a truncated checkpoint.
+    """
+    partial = f"{path}.partial"
+    with open(partial, 'wb') as f:
+        np.savez(f, t=t, positions=positions, momenta=momenta, masses=masses)
+    os.replace(partial, path)
+
+
+def numbered_checkpoint(path, t, dt):
+    """Name under which run keeps the checkpoint at time t, numbered by its step from t = 0."""
+    root, extension = os.path.splitext(path)
+    return f"{root}.{int(round(t / dt)):09d}{extension}"
+
+
+def load_checkpoint(path):
+    """Return the Checkpoint stored at path by save_checkpoint."""
+    with np.load(path) as data:
+        return Checkpoint(t=float(data['t']), positions=data['positions'], momenta=data['momenta'],
+                          masses=data['masses'])
+
+
+def run(positions, momenta, masses, dt, until, t=0.0, checkpoint_path=None, checkpoint_every=None,
+        G=G, softening=0.0, theta=None, method='euler', keep_checkpoints=False):
+    """Integrate headless, as fast as the CPU allows, from time t to time until.
+
+    Nothing is recorded along the way. With a checkpoint_path the state is
+    saved there every checkpoint_every steps and at the end; pass a loaded
+    Checkpoint's fields back in to resume. Each checkpoint replaces the
+    last one at checkpoint_path, so only the latest state is kept, unless
+    keep_checkpoints is True: then every periodic checkpoint is also kept
+    under a numbered name, e.g. binary.npz at step 200000 as
+    binary.000200000.npz, to resume from an earlier state. Every method gives the same
+    result resumed or not, since a step depends only on the state.
+
+    Args:
+        positions, momenta, masses: arrays (n, 3), (n, 3) and (n,), SI units
+        dt: float, seconds
+        until: float, simulated time to stop at, seconds
+        t: float, simulated time of the given state, seconds
+        checkpoint_path: str or None
+        checkpoint_every: int, steps between checkpoints, or None for only at the end
+        keep_checkpoints: bool, also keep each periodic checkpoint under a numbered name
+        G, softening, theta, method: as for integrate
+
+    Returns:
+        Checkpoint of the final state.
+    """
+    positions = np.array(positions, dtype=float)
+    momenta = np.array(momenta, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    start = t
+    steps = max(int(round((until - start) / dt)), 0)
+    for i, positions, momenta in _evolve(positions, momenta, masses, dt, steps, G, softening, theta, method):
+        if checkpoint_path is not None and checkpoint_every and i % checkpoint_every == 0 and i != steps:
+            save_checkpoint(checkpoint_path, start + i * dt, positions, momenta, masses)
+            if keep_checkpoints:
+                save_checkpoint(numbered_checkpoint(checkpoint_path, start + i * dt, dt), start + i * dt,
+                                positions, momenta, masses)
+    final = Checkpoint(t=start + steps * dt, positions=positions, momenta=momenta, masses=masses)
+    if checkpoint_path is not None:
+        save_checkpoint(checkpoint_path, *final)
+    return final
@@ -0,0 +1,32 @@
+"""Pairwise gravity kernel and leapfrog substeps shared by nbody.py and notebooks/gravity.py.
+
+Plain NumPy in SI units with no G of its own, so the N-body simulations and
+the Starship's gravity field, which use different values of G, step with
+the same arithmetic and the same integrator weights.
+"""
+
+import numpy as np
+
+# Kick-drift-kick substeps, as fractions of dt. Yoshida's fourth order
+# method composes three leapfrog steps with these weights.
+YOSHIDA_W1 = 1 / (2 - 2 ** (1 / 3))
+SUBSTEPS = {'verlet': (1.0,),
+            'yoshida4': (YOSHIDA_W1, 1 - 2 * YOSHIDA_W1, YOSHIDA_W1)}
+
+
+def inverse_cube(gm, distance_squared):
+    """G * M / r**3 for each pair, 0 where the separation is 0.
+
+    Times a component of the separation toward the mass, this is that
+    component of the mass's pull.
+
+    Args:
+        gm: array, G times the masses, meters**3 / second**2
+        distance_squared: array broadcastable with gm, meters**2
+
+    Returns:
+        array, 1 / second**2
+    """
+    weight = np.zeros(np.broadcast(gm, distance_squared).shape)
+    np.divide(gm, distance_squared * np.sqrt(distance_squared), out=weight, where=distance_squared > 0)
+    return weight
@@ -0,0 +1,188 @@
+"""Streaming sinks for simulation output.
+
+A sink receives rows one at a time with write(row), where a row is a
+sequence of floats whose first entry is the time, and is finished with
+close(), which returns whatever the sink produced. Decimators are sinks that
+pass a subset of their rows on to another sink, so a long integration can
+feed graphs, files or arrays without storing every step:
+
+    sink = Tee(EveryK(ArraySink(16), 100), LTTB(CSVSink('flight.csv'), 100, column=3))
+    every_100th, _ = integrate_trajectory(p_init, sink=sink)
+
+Nothing here imports vpython; GcurveSink works with anything that has a
+gcurve style plot method.
+"""
+
+import csv
+
+import numpy as np
+
+
+class ArraySink:
+    """Collect rows in a NumPy array that grows by doubling.
+
+    close() returns the (n, columns) array of rows written.
+    """
+    def __init__(self, columns, capacity=1024):
+        self._data = np.empty((capacity, columns))
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def write(self, row):
+        if self._n == len(self._data):
+            grown = np.empty((2 * len(self._data), self._data.shape[1]))
+            grown[:self._n] = self._data
+            self._data = grown
+        self._data[self._n] = row
+        self._n += 1
+
+    def array(self):
+        """Return the rows written so far."""
+        return self._data[:self._n]
+
+    def close(self):
+        return self.array()
+
+
+class CSVSink:
+    """Write rows to a CSV file as they arrive."""
+    def __init__(self, path, header=None):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        if header is not None:
+            self._writer.writerow(header)
+
+    def write(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class GcurveSink:
+    """Plot rows on VPython gcurves, sending points in batches.
+
+    Each gcurve.plot call is a message to the browser, so points are buffered
+    and sent batch at a time.
+
+    Args:
+        curves: dict mapping each curve to the column of the row it plots
+            against time, or to a function of the row
+        batch: int, points buffered per curve before they are sent
+    """
+    def __init__(self, curves, batch=100):
+        self._curves = [(curve, y if callable(y) else (lambda row, column=y: row[column]))
+                        for curve, y in curves.items()]
+        self._points = [[] for _ in self._curves]
+        self.batch = batch
+
+    def write(self, row):
+        for points, (_, y) in zip(self._points, self._curves):
+            points.append([row[0], y(row)])
+        if len(self._points[0]) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """Send the buffered points."""
+        for points, (curve, _) in zip(self._points, self._curves):
+            if points:
+                curve.plot(points)
+                points.clear()
+
+    def close(self):
+        self.flush()
+
+
+class Tee:
+    """Send every row to several sinks. close() returns a list of their results."""
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, row):
+        for sink in self.sinks:
+            sink.write(row)
+
+    def close(self):
+        return [sink.close() for sink in self.sinks]
+
+
+class EveryK:
+    """Pass every k-th row, starting with the first, and the last row on to sink."""
+    def __init__(self, sink, k):
+        self.sink = sink
+        self.k = k
+        self._count = 0
+        self._skipped = None
+
+    def write(self, row):
+        if self._count % self.k == 0:
+            self.sink.write(row)
+            self._skipped = None
+        else:
+            self._skipped = row
+        self._count += 1
+
+    def close(self):
+        if self._skipped is not None:
+            self.sink.write(self._skipped)
+        return self.sink.close()
+
+
+class LTTB:
+    """Largest-triangle-three-buckets downsampling, streamed.
+
+    Rows are grouped into buckets of consecutive rows and one row per bucket
+    is passed on: the one making the largest triangle, in the (time, y)
+    plane, with the row kept from the previous bucket and the average of the
+    next bucket. Peaks and turning points survive where every-k-th sampling
+    would step over them. The first and last rows are always kept, and at
+    most two buckets are held in memory.
+
+    Args:
+        sink: where the kept rows go
+        bucket: int, rows per bucket
+        column: int, column of the row used as y, or a function of the row
+    """
+    def __init__(self, sink, bucket, column=1):
+        self.sink = sink
+        self.bucket = bucket
+        self._y = column if callable(column) else (lambda row: row[column])
+        self._kept = None
+        self._current = []
+        self._next = []
+
+    def write(self, row):
+        row = tuple(row)
+        if self._kept is None:
+            self._keep(row)
+            return
+        self._next.append(row)
+        if len(self._next) == self.bucket:
+            if self._current:
+                self._select(np.mean([r[0] for r in self._next]),
+                             np.mean([self._y(r) for r in self._next]))
+            self._current, self._next = self._next, []
+
+    def _keep(self, row):
+        self.sink.write(row)
+        self._kept = row
+
+    def _select(self, next_t, next_y):
+        kept_t, kept_y = self._kept[0], self._y(self._kept)
+        self._keep(max(self._current,
+                       key=lambda r: abs((kept_t - next_t) * (self._y(r) - kept_y)
+                                         - (kept_t - r[0]) * (next_y - kept_y))))
+
+    def close(self):
+        pending = self._current + self._next
+        if pending:
+            last = pending.pop()
+            if pending:
+                # The remaining rows form the final bucket, aimed at the last row
+                self._current = pending
+                self._select(last[0], self._y(last))
+            self._keep(last)
+        self._current, self._next = [], []
+        return self.sink.close()
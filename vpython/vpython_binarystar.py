@@ -1,30 +1,78 @@
-from vpython import *
-scene.caption = """In GlowScript programs:
+"""A binary star: a red giant and a yellow dwarf in orbit.
+
+With no arguments the system is animated in VPython. With --headless it is
+integrated without rendering or rate limits up to --duration seconds of
+simulated time, saving checkpoints of positions, momenta, masses and time
+to --checkpoint; --resume continues a run from one of them:
+
+    python vpython_binarystar.py --headless --duration 3e10 --checkpoint binary.npz
+    python vpython_binarystar.py --resume binary.npz --duration 3e10 --checkpoint binary.npz
+
+Each checkpoint replaces the previous one in the --checkpoint file; with
+--keep-checkpoints every periodic checkpoint is also kept under a numbered
+name (binary.000100000.npz, ...) so a run can be resumed from any of them.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from nbody import G, load_checkpoint, run, step
+
+giant_mass = 2e30
+dwarf_mass = 1e30
+# The physics runs on arrays in nbody.py; add rows here for more bodies
+positions = np.array([[-1e11, 0, 0], [1.5e11, 0, 0]])
+momenta = np.array([[0, 0, -1e4], [0, 0, 1e4]]) * giant_mass
+masses = np.array([giant_mass, dwarf_mass])
+
+dt = 1e5
+method = 'verlet'  # or 'euler' or 'yoshida4', see nbody.step
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('--headless', action='store_true', help='integrate without animating')
+parser.add_argument('--duration', type=float, default=3.15e9,
+                    help='simulated seconds to stop at when headless (default 100 years)')
+parser.add_argument('--checkpoint', help='file to save checkpoints to (.npz)')
+parser.add_argument('--checkpoint-every', type=int, default=100000, help='steps between checkpoints')
+parser.add_argument('--keep-checkpoints', action='store_true',
+                    help='also keep every periodic checkpoint under a numbered name')
+parser.add_argument('--resume', help='checkpoint to continue from; implies --headless')
+args = parser.parse_args()
+
+if args.headless or args.resume:
+    t = 0.0
+    if args.resume:
+        t, positions, momenta, masses = load_checkpoint(args.resume)
+    start = time.perf_counter()
+    final = run(positions, momenta, masses, dt, args.duration, t=t, checkpoint_path=args.checkpoint,
+                checkpoint_every=args.checkpoint_every, G=G, method=method,
+                keep_checkpoints=args.keep_checkpoints)
+    elapsed = time.perf_counter() - start
+    steps = round((final.t - t) / dt)
+    print(f"Reached t = {final.t:.6g} s: {steps} steps in {elapsed:.3g} s ({steps / max(elapsed, 1e-9):.4g} steps/s)")
+    for i, position in enumerate(final.positions):
+        print(f"body {i}: position {position} m")
+else:
+    from vpython import *
+
+    scene.caption = """In GlowScript programs:
 To rotate "camera", drag with right button or Ctrl-drag.
 To zoom, drag with middle button or Alt/Option depressed, or use scroll wheel.
   On a two-button mouse, middle is left + right.
 To pan left/right and up/down, Shift-drag.
 Touch screen: pinch/extend to zoom, swipe or two-finger rotate."""
-scene.forward = vector(0,-.3,-1)
+    scene.forward = vector(0,-.3,-1)
 
-G = 6.7e-11 # Newton gravitational constant
+    giant = sphere(pos=vector(*positions[0]), radius=2e10, color=color.red,
+                    make_trail=True, trail_type='points', interval=10, retain=50)
+    dwarf = sphere(pos=vector(*positions[1]), radius=1e10, color=color.yellow,
+                    make_trail=True, interval=10, retain=50)
+    bodies = [giant, dwarf]
 
-giant = sphere(pos=vector(-1e11,0,0), radius=2e10, color=color.red, 
-                make_trail=True, trail_type='points', interval=10, retain=50)
-giant.mass = 2e30
-giant.p = vector(0, 0, -1e4) * giant.mass
-
-dwarf = sphere(pos=vector(1.5e11,0,0), radius=1e10, color=color.yellow,
-                make_trail=True, interval=10, retain=50)
-dwarf.mass = 1e30
-dwarf.p = -giant.p
-
-dt = 1e5
-while True:
-    rate(200)
-    r = dwarf.pos - giant.pos
-    F = G * giant.mass * dwarf.mass * r.hat / mag(r)**2
-    giant.p = giant.p + F*dt
-    dwarf.p = dwarf.p - F*dt
-    giant.pos = giant.pos + (giant.p/giant.mass) * dt
-    dwarf.pos = dwarf.pos + (dwarf.p/dwarf.mass) * dt
+    while True:
+        rate(200)
+        positions, momenta = step(positions, momenta, masses, dt, G, method=method)
+        for body, pos in zip(bodies, positions):
+            body.pos = vector(*pos)